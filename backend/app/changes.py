@@ -0,0 +1,146 @@
+"""
+Change recording for the live change feed and delta sync.
+
+``record_change`` stashes an event on the session. When the session commits,
+the events are appended to ``change_log`` in the same transaction, which
+assigns each one its ``seq``. They are then published to
+``app.events.broker``. On rollback they are discarded, so neither
+subscribers nor ``/sync`` ever see changes that did not happen.
+``python -m app.changes`` prunes old ``change_log`` rows.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import Session
+from .events import broker
+from .models import ChangeLog
+
+PENDING_CHANGES_KEY = "pending_changes"
+# Arbitrary application-wide key for the advisory lock taken by change-log writers
+CHANGE_LOG_LOCK_KEY = 8_140_001
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+
+
+def record_change(
+    db,
+    entity: str,
+    entity_id: int,
+    op: str,
+    project_id: Optional[int],
+    data: Optional[dict] = None
+):
+    """Queue a ``created``/``updated``/``deleted`` event, published on commit.
+
+    ``db`` may be a ``Session`` or an ``AsyncSession``.
+    """
+    db.info.setdefault(PENDING_CHANGES_KEY, []).append({
+        "entity": entity,
+        "id": entity_id,
+        "op": op,
+        "project_id": project_id,
+        "data": data
+    })
+
+
+def project_payload(project) -> dict:
+    """Fields of a project carried by its change events."""
+    return {
+        "title": project.title,
+        "status": project.status
+    }
+
+
+def task_payload(task) -> dict:
+    """Fields of a task carried by its change events."""
+    return {
+        "title": task.title,
+        "status": task.status,
+        "priority": task.priority,
+        "assignee_id": task.assignee_id
+    }
+
+
+def comment_payload(comment) -> dict:
+    """Fields of a comment carried by its change events."""
+    return {
+        "task_id": comment.task_id,
+        "user_id": comment.user_id,
+        "content": comment.content
+    }
+
+
+def time_log_payload(time_log) -> dict:
+    """Fields of a time log carried by its change events."""
+    return {
+        "task_id": time_log.task_id,
+        "user_id": time_log.user_id,
+        "hours": time_log.hours,
+        "date": time_log.date
+    }
+
+
+@event.listens_for(Session, "before_commit")
+def _log_changes(session: Session):
+    changes = session.info.get(PENDING_CHANGES_KEY)
+    if not changes:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        # Hold change-log writers in line until commit, so that seq order is
+        # commit order and a sync client can never skip a late-committing row
+        session.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_KEY)))
+    entries = [
+        ChangeLog(
+            entity=change["entity"],
+            entity_id=change["id"],
+            op=change["op"],
+            project_id=change["project_id"]
+        )
+        for change in changes
+    ]
+    session.add_all(entries)
+    session.flush()
+    for change, entry in zip(changes, entries):
+        change["seq"] = entry.seq
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session):
+    for change in session.info.pop(PENDING_CHANGES_KEY, []):
+        broker.publish(change)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop(PENDING_CHANGES_KEY, None)
+
+
+def prune_change_log(db: Session, retention_days: int = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """Delete change-log rows older than the retention period.
+
+    Clients whose sync token predates the oldest remaining row are told to
+    reload. Returns the number of rows removed; the caller commits.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    return db.execute(delete(ChangeLog).where(ChangeLog.changed_at < cutoff)).rowcount
+
+
+def main():
+    """Prune the change log from the command line."""
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        removed = prune_change_log(db)
+        db.commit()
+        print(f"Pruned {removed} change log row(s) older than {CHANGE_LOG_RETENTION_DAYS} days.")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import asyncio
 import logging
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from pydantic import EmailStr
-from typing import Optional
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+import aiosmtplib
 import os
 from dotenv import load_dotenv
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from .database import AsyncSessionLocal
+from .models import EmailOutbox
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -11,28 +17,36 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Email configuration
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME", "your-email@gmail.com"),
-    MAIL_PASSWORD=os.getenv("MAIL_PASSWORD", "your-app-password"),
-    MAIL_FROM=os.getenv("MAIL_FROM", "your-email@gmail.com"),
-    MAIL_PORT=587,
-    MAIL_SERVER="smtp.gmail.com",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
-
-fastmail = FastMail(conf)
-
-async def send_task_assignment_email(
-    user_email: str,
+MAIL_USERNAME = os.getenv("MAIL_USERNAME", "your-email@gmail.com")
+MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "your-app-password")
+MAIL_FROM = os.getenv("MAIL_FROM", "your-email@gmail.com")
+MAIL_PORT = int(os.getenv("MAIL_PORT", "587"))
+MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+MAIL_STARTTLS = os.getenv("MAIL_STARTTLS", "true").lower() == "true"
+MAIL_SSL_TLS = os.getenv("MAIL_SSL_TLS", "false").lower() == "true"
+USE_CREDENTIALS = os.getenv("USE_CREDENTIALS", "true").lower() == "true"
+VALIDATE_CERTS = os.getenv("VALIDATE_CERTS", "true").lower() == "true"
+
+# Outbox delivery configuration
+EMAIL_WORKER_ENABLED = os.getenv("EMAIL_WORKER_ENABLED", "true").lower() == "true"
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_CONCURRENCY = int(os.getenv("EMAIL_CONCURRENCY", "2"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_POLL_INTERVAL_SECONDS = float(os.getenv("EMAIL_POLL_INTERVAL_SECONDS", "5"))
+EMAIL_SEND_LEASE_SECONDS = float(os.getenv("EMAIL_SEND_LEASE_SECONDS", "300"))
+# Seconds each notification is held back so later ones to the same recipient
+# can join its digest. Off by default: notifications go out on the next drain,
+# and only those already queued for a recipient are merged.
+EMAIL_COALESCE_WINDOW_SECONDS = float(os.getenv("EMAIL_COALESCE_WINDOW_SECONDS", "0"))
+
+def render_task_assignment_email(
     user_name: str,
     task_title: str,
     project_name: str,
     assigned_by: str
 ):
-    """Send email notification when a task is assigned to a user."""
+    """Render the email sent when a task is assigned to a user."""
     
     subject = f"New Task Assigned: {task_title}"
     
@@ -76,29 +90,16 @@ async def send_task_assignment_email(
     </div>
     """
     
-    message = MessageSchema(
-        subject=subject,
-        recipients=[user_email],
-        body=html_content,
-        subtype="html"
-    )
-    
-    try:
-        await fastmail.send_message(message)
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        return False
-
-async def send_task_update_email(
-    user_email: str,
+    return subject, html_content
+
+def render_task_update_email(
     user_name: str,
     task_title: str,
     project_name: str,
     update_type: str,
     updated_by: str
 ):
-    """Send email notification when a task is updated."""
+    """Render the email sent when a task is updated."""
     
     subject = f"Task Updated: {task_title}"
     
@@ -143,28 +144,15 @@ async def send_task_update_email(
     </div>
     """
     
-    message = MessageSchema(
-        subject=subject,
-        recipients=[user_email],
-        body=html_content,
-        subtype="html"
-    )
-    
-    try:
-        await fastmail.send_message(message)
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        return False
-
-async def send_task_completion_email(
-    user_email: str,
+    return subject, html_content
+
+def render_task_completion_email(
     user_name: str,
     task_title: str,
     project_name: str,
     completed_by: str
 ):
-    """Send email notification when a task is completed."""
+    """Render the email sent when a task is completed."""
     
     subject = f"Task Completed: {task_title}"
     
@@ -208,16 +196,300 @@ async def send_task_completion_email(
     </div>
     """
     
-    message = MessageSchema(
-        subject=subject,
-        recipients=[user_email],
-        body=html_content,
-        subtype="html"
+    return subject, html_content 
+def summarize_task_assignment(task_title: str, project_name: str, assigned_by: str, **_):
+    return f"{task_title} ({project_name}) was assigned to you by {assigned_by}"
+
+
+def summarize_task_update(task_title: str, project_name: str, update_type: str, updated_by: str, **_):
+    return f"{task_title} ({project_name}): {update_type} by {updated_by}"
+
+
+def summarize_task_completion(task_title: str, project_name: str, completed_by: str, **_):
+    return f"{task_title} ({project_name}) was completed by {completed_by}"
+
+
+def render_digest_email(user_name: str, summaries: List[str]):
+    """Render one email summarizing several task notifications."""
+    
+    subject = f"{len(summaries)} task updates"
+    items = "".join(
+        f'<p style="margin: 5px 0; color: #666;">• {summary}</p>' for summary in summaries
     )
     
-    try:
-        await fastmail.send_message(message)
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send email: {e}")
-        return False 
\ No newline at end of file
+    html_content = f"""
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px 10px 0 0;">
+            <h1 style="margin: 0; font-size: 24px;">📬 Task Activity</h1>
+        </div>
+        
+        <div style="background: #f8f9fa; padding: 20px; border-radius: 0 0 10px 10px; border: 1px solid #e9ecef;">
+            <p style="font-size: 16px; color: #333; margin-bottom: 20px;">
+                Hello <strong>{user_name}</strong>,
+            </p>
+            
+            <p style="font-size: 16px; color: #333; margin-bottom: 20px;">
+                Here is what happened on your tasks recently.
+            </p>
+            
+            <div style="background: white; padding: 20px; border-radius: 8px; border-left: 4px solid #667eea; margin: 20px 0;">
+                <h3 style="margin: 0 0 10px 0; color: #333;">Updates</h3>
+                {items}
+            </div>
+            
+            <div style="text-align: center; margin-top: 30px;">
+                <a href="{os.getenv('FRONTEND_URL', 'https://project-management-dashboard-dno2.vercel.app')}" 
+                   style="background: #667eea; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; display: inline-block;">
+                    View Dashboard
+                </a>
+            </div>
+        </div>
+        
+        <div style="text-align: center; margin-top: 20px; color: #666; font-size: 12px;">
+            <p>This is an automated notification from Project Management Dashboard</p>
+        </div>
+    </div>
+    """
+    
+    return subject, html_content
+
+
+TEMPLATES = {
+    "task_assignment": (render_task_assignment_email, summarize_task_assignment),
+    "task_update": (render_task_update_email, summarize_task_update),
+    "task_completion": (render_task_completion_email, summarize_task_completion),
+}
+
+
+def queue_email(db: Session, recipient: str, template: str, **context):
+    """Add a notification to the outbox as part of the caller's transaction.
+
+    Delivery is held back for ``EMAIL_COALESCE_WINDOW_SECONDS``, if set, so
+    that further notifications to the same recipient can join the same digest.
+    """
+    db.add(EmailOutbox(
+        recipient=recipient,
+        template=template,
+        context=context,
+        available_at=datetime.utcnow() + timedelta(seconds=EMAIL_COALESCE_WINDOW_SECONDS)
+    ))
+
+
+def queue_task_assignment_email(db: Session, user_email: str, **context):
+    """Queue the notification sent when a task is assigned to a user."""
+    queue_email(db, user_email, "task_assignment", **context)
+
+
+def queue_task_update_email(db: Session, user_email: str, **context):
+    """Queue the notification sent when a task is updated."""
+    queue_email(db, user_email, "task_update", **context)
+
+
+def queue_task_completion_email(db: Session, user_email: str, **context):
+    """Queue the notification sent when a task is completed."""
+    queue_email(db, user_email, "task_completion", **context)
+
+
+def build_message(entries: List[EmailOutbox]) -> EmailMessage:
+    """Render outbox entries for one recipient into a single MIME message.
+
+    A single entry uses its own template; several are merged into a digest.
+    """
+    if len(entries) == 1:
+        render, _ = TEMPLATES[entries[0].template]
+        subject, html_content = render(**entries[0].context)
+    else:
+        summaries = []
+        for entry in entries:
+            _, summarize = TEMPLATES[entry.template]
+            summary = summarize(**entry.context)
+            if summary not in summaries:
+                summaries.append(summary)
+        subject, html_content = render_digest_email(entries[0].context.get("user_name", ""), summaries)
+
+    message = EmailMessage()
+    message["From"] = MAIL_FROM
+    message["To"] = entries[0].recipient
+    message["Subject"] = subject
+    message.set_content(html_content, subtype="html")
+    return message
+
+
+def smtp_client() -> aiosmtplib.SMTP:
+    """Create an SMTP client from the mail configuration."""
+    return aiosmtplib.SMTP(
+        hostname=MAIL_SERVER,
+        port=MAIL_PORT,
+        username=MAIL_USERNAME if USE_CREDENTIALS else None,
+        password=MAIL_PASSWORD if USE_CREDENTIALS else None,
+        use_tls=MAIL_SSL_TLS,
+        start_tls=MAIL_STARTTLS if not MAIL_SSL_TLS else False,
+        validate_certs=VALIDATE_CERTS
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff before the next delivery attempt."""
+    return timedelta(seconds=EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+class EmailOutboxWorker:
+    """Background worker that drains the email outbox in batches.
+
+    Due entries are grouped per recipient, pulling in that recipient's
+    entries whose coalescing window is still open, and each group is sent
+    as one email. The messages of a batch are split across at most
+    ``EMAIL_CONCURRENCY`` SMTP connections, and every connection is reused
+    for all messages in its share of the batch. Failed messages are retried
+    with exponential backoff until ``EMAIL_MAX_ATTEMPTS`` is reached.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, client_factory=smtp_client):
+        self.session_factory = session_factory
+        self.client_factory = client_factory
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+
+    def wake(self):
+        """Drain the outbox now instead of waiting for the next poll.
+
+        Safe to call from any thread; sync route handlers run in the threadpool.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wakeup.set()
+        else:
+            # asyncio.Event is not thread-safe, so set it from the worker's loop
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        while True:
+            try:
+                sent = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Email outbox drain failed: {e}")
+                sent = 0
+            if sent < EMAIL_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), EMAIL_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """Deliver one batch of due messages. Returns the number of messages claimed."""
+        entries = await self._claim_batch()
+        if not entries:
+            return 0
+
+        by_recipient: Dict[str, List[EmailOutbox]] = {}
+        for entry in entries:
+            by_recipient.setdefault(entry.recipient, []).append(entry)
+        digests = list(by_recipient.values())
+
+        groups = [digests[i::EMAIL_CONCURRENCY] for i in range(min(EMAIL_CONCURRENCY, len(digests)))]
+        results = {}
+        for group_results in await asyncio.gather(*(self._send_group(group) for group in groups)):
+            results.update(group_results)
+
+        await self._record_results(results)
+        return len(entries)
+
+    async def _claim_batch(self) -> List[EmailOutbox]:
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            query = select(EmailOutbox).where(
+                EmailOutbox.status.in_(["pending", "sending"]),
+                EmailOutbox.available_at <= now
+            ).order_by(EmailOutbox.id).limit(EMAIL_BATCH_SIZE)
+            if db.bind.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+
+            entries = list((await db.scalars(query)).all())
+            if entries:
+                # Close the coalescing window for these recipients early, but
+                # leave retries in their backoff
+                companions = select(EmailOutbox).where(
+                    EmailOutbox.status == "pending",
+                    or_(EmailOutbox.attempts == 0, EmailOutbox.available_at <= now),
+                    EmailOutbox.recipient.in_({entry.recipient for entry in entries}),
+                    EmailOutbox.id.notin_([entry.id for entry in entries])
+                ).order_by(EmailOutbox.id)
+                if db.bind.dialect.name == "postgresql":
+                    companions = companions.with_for_update(skip_locked=True)
+                entries.extend((await db.scalars(companions)).all())
+
+            for entry in entries:
+                # Lease the entry so a crashed worker's batch is picked up again later
+                entry.status = "sending"
+                entry.attempts += 1
+                entry.available_at = now + timedelta(seconds=EMAIL_SEND_LEASE_SECONDS)
+            await db.commit()
+            return entries
+
+    async def _send_group(self, digests: List[List[EmailOutbox]]) -> Dict[int, Optional[str]]:
+        """Send digests over one SMTP connection. Maps entry id to an error or None."""
+        results = {}
+        try:
+            async with self.client_factory() as smtp:
+                for entries in digests:
+                    try:
+                        await smtp.send_message(build_message(entries))
+                        error = None
+                    except aiosmtplib.SMTPServerDisconnected:
+                        raise
+                    except Exception as e:
+                        error = str(e)
+                    for entry in entries:
+                        results[entry.id] = error
+        except Exception as e:
+            for entries in digests:
+                for entry in entries:
+                    results.setdefault(entry.id, str(e))
+        return results
+
+    async def _record_results(self, results: Dict[int, Optional[str]]):
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            entries = (await db.scalars(select(EmailOutbox).where(EmailOutbox.id.in_(list(results))))).all()
+            for entry in entries:
+                error = results[entry.id]
+                if error is None:
+                    entry.status = "sent"
+                    entry.sent_at = now
+                    entry.last_error = None
+                elif entry.attempts >= EMAIL_MAX_ATTEMPTS:
+                    entry.status = "failed"
+                    entry.last_error = error
+                    logger.error(f"Giving up on email {entry.id} to {entry.recipient}: {error}")
+                else:
+                    entry.status = "pending"
+                    entry.available_at = now + retry_delay(entry.attempts)
+                    entry.last_error = error
+                    logger.warning(f"Failed to send email {entry.id}, retrying: {error}")
+            await db.commit()
+
+
+email_worker = EmailOutboxWorker()
@@ -0,0 +1,68 @@
+"""
+ETags and conditional GETs for read endpoints.
+
+A single resource's ETag is derived from its ``version`` column, which every
+UPDATE bumps. A list's ETag is derived from an aggregate watermark of the
+rows it selects (row count, highest id and the sum of their versions) plus
+the request parameters that shape the page, so it changes whenever a row is
+added, removed or edited. The watermark is one indexed aggregate query,
+which lets a matching ``If-None-Match`` be answered with a 304 before the
+page itself is loaded or serialized.
+"""
+
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that identify a representation."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """An empty 304 response carrying the current ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+
+
+def set_etag(response: Response, etag: str):
+    """Expose the representation's ETag on the response headers."""
+    response.headers[ETAG_HEADER] = etag
+
+
+def list_watermark(query: Query, model, *aggregates) -> tuple:
+    """Aggregate state of the rows ``query`` selects.
+
+    ``query`` must not carry loader options; extra ``aggregates`` (for
+    example the latest ``updated_at`` of joined rows) are appended.
+    """
+    return query.order_by(None).with_entities(
+        func.count(model.id),
+        func.max(model.id),
+        func.coalesce(func.sum(model.version), 0),
+        *aggregates
+    ).one()
+
+
+def list_etag(query: Query, model, *params: Optional[Any], aggregates: tuple = ()) -> str:
+    """ETag for a list endpoint, from its watermark and page parameters."""
+    return make_etag(model.__tablename__, *list_watermark(query, model, *aggregates), *params)
@@ -0,0 +1,152 @@
+"""
+In-process fan-out of change events to streaming clients.
+
+Routers record changes on their session (see ``app.changes``); once the
+transaction commits the events are handed to ``broker``, which pushes them
+to every ``/stream`` subscriber of the affected project. The transport
+between publishers and subscribers is pluggable:
+
+* ``local`` (default) delivers within the current process only.
+* ``postgres`` relays events through ``LISTEN``/``NOTIFY`` so that every
+  worker process of a multi-worker deployment sees every change.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional, Set
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "local")
+EVENT_CHANNEL = os.getenv("EVENT_CHANNEL", "project_changes")
+# Events buffered per subscriber before the oldest are dropped
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+# Postgres caps NOTIFY payloads at 8000 bytes; larger events are sent without data
+NOTIFY_MAX_PAYLOAD = 7900
+
+
+class LocalBackend:
+    """Delivers published events straight back to this process."""
+
+    async def start(self, deliver: Callable[[dict], None]):
+        self._deliver = deliver
+
+    async def stop(self):
+        pass
+
+    def publish(self, event: dict):
+        self._deliver(event)
+
+
+class PostgresBackend:
+    """Relays events between processes with Postgres ``LISTEN``/``NOTIFY``."""
+
+    def __init__(self, dsn: str, channel: str = EVENT_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._listener = None
+        self._sender = None
+        self._outgoing: Optional[asyncio.Queue] = None
+        self._send_task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Callable[[dict], None]):
+        import asyncpg
+
+        def on_notify(connection, pid, channel, payload):
+            deliver(json.loads(payload))
+
+        self._listener = await asyncpg.connect(self.dsn)
+        await self._listener.add_listener(self.channel, on_notify)
+        self._sender = await asyncpg.connect(self.dsn)
+        self._outgoing = asyncio.Queue()
+        self._send_task = asyncio.create_task(self._send())
+
+    async def stop(self):
+        if self._send_task is not None:
+            self._send_task.cancel()
+        for connection in (self._listener, self._sender):
+            if connection is not None:
+                await connection.close()
+
+    def publish(self, event: dict):
+        self._outgoing.put_nowait(event)
+
+    async def _send(self):
+        while True:
+            event = await self._outgoing.get()
+            payload = json.dumps(event, default=str)
+            if len(payload.encode()) > NOTIFY_MAX_PAYLOAD:
+                payload = json.dumps({**event, "data": None}, default=str)
+            try:
+                await self._sender.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except Exception as e:
+                logger.error(f"Failed to publish change event: {e}")
+
+
+class EventBroker:
+    """Routes change events to per-project subscriber queues."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self._deliver)
+
+    async def stop(self):
+        await self.backend.stop()
+        self._loop = None
+
+    def publish(self, event: dict):
+        """Publish an event; safe to call from any thread."""
+        if self._loop is None:
+            # Not serving (CLI scripts, tests): nobody can be listening
+            return
+        self._loop.call_soon_threadsafe(self.backend.publish, event)
+
+    def _deliver(self, event: dict):
+        for queue in list(self._subscribers.get(event.get("project_id"), ())):
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block everyone
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, project_id: int):
+        """Yield a queue receiving the events of one project until the block exits."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers[project_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[project_id].discard(queue)
+            if not self._subscribers[project_id]:
+                del self._subscribers[project_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+def create_backend(name: str = EVENT_BACKEND):
+    """Build the configured event backend."""
+    if name == "postgres":
+        from sqlalchemy.engine import make_url
+        from .database import DATABASE_URL
+
+        dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresBackend(dsn)
+    if name == "local":
+        return LocalBackend()
+    raise ValueError(f"Unknown EVENT_BACKEND: {name}")
+
+
+broker = EventBroker(create_backend())
@@ -0,0 +1,84 @@
+"""
+Streaming CSV / NDJSON exports.
+
+Rows are read through a server-side cursor (``yield_per``) and written out
+one batch at a time, so memory use does not grow with the size of the
+export. Each export runs in a session of its own that lives as long as the
+response body is being streamed.
+"""
+
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import Iterator, List
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+
+def _value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows, columns: List[str], header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows, columns: List[str], header: bool) -> str:
+    return "".join(
+        json.dumps({column: _value(value) for column, value in zip(columns, row)}) + "\n"
+        for row in rows
+    )
+
+
+def stream_export(statement: Select, export_format: str) -> Iterator[str]:
+    """Yield the rows of ``statement`` as CSV or NDJSON text chunks."""
+    from .database import SessionLocal
+
+    write_chunk = _csv_chunk if export_format == "csv" else _ndjson_chunk
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE, stream_results=True))
+        columns = list(result.keys())
+        header = True
+        for rows in result.partitions():
+            yield write_chunk(rows, columns, header)
+            header = False
+        if header and export_format == "csv":
+            # No rows: still send the header line
+            yield write_chunk([], columns, header)
+    finally:
+        db.close()
+
+
+def export_response(statement: Select, export_format: str, filename: str) -> StreamingResponse:
+    """Stream the rows of ``statement`` as a downloadable CSV or NDJSON file."""
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format, expected one of: {', '.join(EXPORT_MEDIA_TYPES)}"
+        )
+    return StreamingResponse(
+        stream_export(statement, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
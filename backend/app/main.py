@@ -1,40 +1,64 @@
-from fastapi import FastAPI, HTTPException, Depends
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-from .database import engine
-from .models import Base
-from .routers import auth, projects, tasks, users, comments, timelog
+from .routers import auth, projects, tasks, users, comments, timelog, stream, sync, search
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
-from .database import get_db
+from .database import get_db, pool_status
 from .models import Task, User, TimeLog, Project
 from .auth import get_current_active_user
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Seed database with sample data automatically
-import os
-print("Starting application...")
-print(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
-print(f"Database URL: {os.getenv('DATABASE_URL', 'Not set')}")
-
-try:
-    from .seed_data import main as seed_main
-    print("Importing seed data module...")
-    seed_main()
-    print("Seed data execution completed successfully!")
-except Exception as e:
-    print(f"Warning: Could not seed database: {e}")
-    import traceback
-    traceback.print_exc()
+from .performance import compute_performance_metrics
+from .pagination import NEXT_CURSOR_HEADER
+from .etag import ETAG_HEADER
+from .query_stats import QueryStatsMiddleware
+from .metrics import MetricsMiddleware, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .email_service import email_worker, EMAIL_WORKER_ENABLED
+from .passwords import shutdown_pool
+from .time_tracking import reconcile_periodically, ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS
+from .events import broker
+
+logger = logging.getLogger(__name__)
+
+# Importing this module has no side effects: apply the schema with
+# `python -m app.migrations` before starting the server
+SEED_ON_STARTUP = os.getenv("SEED_ON_STARTUP", "false").lower() == "true"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background workers, and stop them again on shutdown."""
+    if SEED_ON_STARTUP:
+        try:
+            from .seed_data import main as seed_main
+            await run_in_threadpool(seed_main)
+        except Exception:
+            logger.exception("Could not seed database")
+    
+    if EMAIL_WORKER_ENABLED:
+        email_worker.start()
+    await broker.start()
+    background_tasks = []
+    if ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS > 0:
+        # Periodically repair drift between actual_hours and the logged hours
+        background_tasks.append(asyncio.create_task(reconcile_periodically()))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await broker.stop()
+        await email_worker.stop()
+        shutdown_pool()
 
 # Create FastAPI app
 app = FastAPI(
     title="Project Management Dashboard API",
     description="A comprehensive API for managing projects, tasks, and team collaboration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 def custom_openapi():
@@ -59,7 +83,7 @@ def custom_openapi():
     
     # Add security to all protected endpoints and fix existing security
     for path in openapi_schema["paths"]:
-        if path not in ["/auth/login", "/auth/register", "/health"]:  # Exclude auth and health endpoints
+        if path not in ["/auth/login", "/auth/register", "/health", "/health/db-pool", "/metrics"]:  # Exclude auth and health endpoints
             for method in openapi_schema["paths"][path]:
                 if method.lower() in ["get", "post", "put", "delete"]:
                     # Replace any existing security with the correct one
@@ -70,8 +94,6 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
-import os
-
 # Configure CORS
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000")
 if cors_origins == "*":
@@ -85,8 +107,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
 
+# Count each request's SQL statements and report them in Server-Timing
+app.add_middleware(QueryStatsMiddleware)
+# Per-route request counts and latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(projects.router)
@@ -94,6 +122,9 @@ app.include_router(tasks.router)
 app.include_router(users.router)
 app.include_router(comments.router)
 app.include_router(timelog.router)
+app.include_router(stream.router)
+app.include_router(sync.router)
+app.include_router(search.router)
 
 
 @app.get("/")
@@ -110,6 +141,16 @@ def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/health/db-pool")
+def db_pool_status():
+    """Connection pool usage of the sync and async engines (checked out, idle, overflow and wait time)."""
+    return pool_status()
+
+@app.get("/metrics")
+def metrics(db: Session = Depends(get_db)):
+    """Service metrics (request rates, latency, pool, outbox, caches) for Prometheus."""
+    return Response(content=render_metrics(db), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/seed-status")
 def seed_status(db: Session = Depends(get_db)):
     """Check if seed data exists."""
@@ -147,102 +188,6 @@ def get_performance_metrics(
 ):
     """Get performance metrics for the dashboard."""
     try:
-        # Calculate date ranges
-        now = datetime.utcnow()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        # 1. Tasks completed this week
-        tasks_completed_this_week = db.query(Task).filter(
-            and_(
-                Task.status == 'closed',
-                Task.updated_at >= week_ago
-            )
-        ).count()
-        
-        # 2. Average task completion time (in days)
-        completed_tasks = db.query(Task).filter(
-            and_(
-                Task.status == 'closed',
-                Task.created_at.isnot(None),
-                Task.updated_at.isnot(None)
-            )
-        ).all()
-        
-        total_completion_days = 0
-        valid_tasks = 0
-        
-        for task in completed_tasks:
-            if task.created_at and task.updated_at:
-                completion_time = (task.updated_at - task.created_at).days
-                if completion_time >= 0:  # Only count valid completion times
-                    total_completion_days += completion_time
-                    valid_tasks += 1
-        
-        avg_completion_days = round(total_completion_days / valid_tasks, 1) if valid_tasks > 0 else 0
-        
-        # 3. Team productivity score (based on completed tasks vs total tasks)
-        total_tasks = db.query(Task).count()
-        completed_tasks_count = db.query(Task).filter(Task.status == 'closed').count()
-        productivity_score = round((completed_tasks_count / total_tasks * 100), 1) if total_tasks > 0 else 0
-        
-        # 4. Project health indicators
-        projects = db.query(Project).all()
-        project_health = []
-        
-        for project in projects:
-            project_tasks = db.query(Task).filter(Task.project_id == project.id).all()
-            total_project_tasks = len(project_tasks)
-            completed_project_tasks = len([t for t in project_tasks if t.status == 'closed'])
-            
-            if total_project_tasks > 0:
-                completion_rate = round((completed_project_tasks / total_project_tasks * 100), 1)
-                health_status = "healthy" if completion_rate >= 70 else "warning" if completion_rate >= 40 else "critical"
-            else:
-                completion_rate = 0
-                health_status = "no_tasks"
-            
-            project_health.append({
-                "project_id": project.id,
-                "project_title": project.title,
-                "completion_rate": completion_rate,
-                "total_tasks": total_project_tasks,
-                "completed_tasks": completed_project_tasks,
-                "health_status": health_status
-            })
-        
-        # 5. Time tracking metrics
-        total_logged_hours = db.query(func.sum(TimeLog.hours)).scalar() or 0
-        avg_hours_per_task = round(total_logged_hours / total_tasks, 1) if total_tasks > 0 else 0
-        
-        # 6. Weekly trends
-        weekly_completed_tasks = []
-        for i in range(7):
-            day_start = week_ago + timedelta(days=i)
-            day_end = day_start + timedelta(days=1)
-            daily_completed = db.query(Task).filter(
-                and_(
-                    Task.status == 'closed',
-                    Task.updated_at >= day_start,
-                    Task.updated_at < day_end
-                )
-            ).count()
-            weekly_completed_tasks.append({
-                "day": day_start.strftime("%A"),
-                "completed": daily_completed
-            })
-        
-        return {
-            "tasks_completed_this_week": tasks_completed_this_week,
-            "avg_completion_days": avg_completion_days,
-            "productivity_score": productivity_score,
-            "project_health": project_health,
-            "total_logged_hours": total_logged_hours,
-            "avg_hours_per_task": avg_hours_per_task,
-            "weekly_trends": weekly_completed_tasks,
-            "total_tasks": total_tasks,
-            "completed_tasks": completed_tasks_count
-        }
-        
+        return compute_performance_metrics(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating performance metrics: {str(e)}") 
\ No newline at end of file
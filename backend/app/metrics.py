@@ -0,0 +1,180 @@
+"""
+Service metrics in the Prometheus text exposition format.
+
+``MetricsMiddleware`` counts requests and records their latency per route
+template (``/tasks/{task_id}``, not the concrete path), so label
+cardinality stays bounded. It runs on the event loop thread only, so the
+counters are plain integers with no locking. Gauges such as pool usage,
+outbox depth and cache hit ratios are read when ``/metrics`` is scraped.
+"""
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from .cache import caches
+from .database import pool_status
+from .events import broker
+from .models import EmailOutbox
+
+# Starlette appends "; charset=utf-8" to text media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+# Upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests that matched no route share one label
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Per-bucket counts plus sum; made cumulative when rendered."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        rows = []
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            rows.append((bound, total))
+        return rows
+
+
+class RequestMetrics:
+    """Request counts and latencies keyed by method and route template."""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+
+    def observe(self, method: str, route: str, status_code: int, duration: float, streamed: bool = False):
+        self.requests[(method, route, str(status_code))] += 1
+        if not streamed:
+            # Event streams stay open for minutes and would swamp the histogram
+            self.latency[(method, route)].observe(duration)
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """Records every HTTP request in ``request_metrics``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "streamed": False}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["streamed"] = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            # The router stores the matched route on the shared scope
+            route = scope.get("route")
+            request_metrics.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                response["status"],
+                time.perf_counter() - start,
+                response["streamed"]
+            )
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _metric(name: str, metric_type: str, help_text: str, samples: Iterable[Tuple[str, str, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{sample_name}{labels} {value}" for sample_name, labels, value in samples)
+    return lines
+
+
+def render_metrics(db: Session) -> str:
+    """Render every metric in the text exposition format."""
+    lines = []
+
+    lines += _metric("http_requests_total", "counter", "HTTP requests by method, route and status code.", (
+        ("http_requests_total", _labels(method=method, route=route, status=status_code), count)
+        for (method, route, status_code), count in sorted(request_metrics.requests.items())
+    ))
+    latency_samples = []
+    for (method, route), histogram in sorted(request_metrics.latency.items()):
+        for bound, count in histogram.cumulative():
+            latency_samples.append(("http_request_duration_seconds_bucket", _labels(method=method, route=route, le=bound), count))
+        latency_samples.append(("http_request_duration_seconds_sum", _labels(method=method, route=route), round(histogram.sum, 6)))
+        latency_samples.append(("http_request_duration_seconds_count", _labels(method=method, route=route), sum(histogram.counts)))
+    lines += _metric("http_request_duration_seconds", "histogram", "HTTP request latency by method and route.", latency_samples)
+
+    # One set of samples per engine: the sync one and the async one
+    pools = pool_status()
+    lines += _metric("db_pool_connections", "gauge", "Database connections by engine and state.", (
+        ("db_pool_connections", _labels(engine=name, state=state), pool[state])
+        for name, pool in pools.items()
+        for state in ("checked_out", "idle", "overflow") if state in pool
+    ))
+    lines += _metric("db_pool_size", "gauge", "Configured database pool size by engine.", (
+        ("db_pool_size", _labels(engine=name), pool["size"]) for name, pool in pools.items() if "size" in pool
+    ))
+    lines += _metric("db_pool_checkouts_total", "counter", "Connections checked out of each engine's pool.", (
+        ("db_pool_checkouts_total", _labels(engine=name), pool["wait"]["checkouts"])
+        for name, pool in pools.items() if "wait" in pool
+    ))
+    lines += _metric("db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection, by engine.", (
+        ("db_pool_wait_seconds_total", _labels(engine=name), round(pool["wait"]["total_wait_ms"] / 1000, 6))
+        for name, pool in pools.items() if "wait" in pool
+    ))
+
+    # Only the live statuses are counted, which keeps this an index range scan
+    depth = dict.fromkeys(("pending", "sending"), 0)
+    depth.update(
+        db.query(EmailOutbox.status, func.count(EmailOutbox.id))
+        .filter(EmailOutbox.status.in_(list(depth)))
+        .group_by(EmailOutbox.status)
+    )
+    lines += _metric("email_outbox_depth", "gauge", "Outbox emails waiting to be sent, by status.", (
+        ("email_outbox_depth", _labels(status=outbox_status), count) for outbox_status, count in depth.items()
+    ))
+
+    cache_samples = {"hits": [], "misses": [], "ratio": [], "size": []}
+    for name, cache in sorted(caches.items()):
+        lookups = cache.hits + cache.misses
+        cache_samples["hits"].append(("cache_hits_total", _labels(cache=name), cache.hits))
+        cache_samples["misses"].append(("cache_misses_total", _labels(cache=name), cache.misses))
+        cache_samples["ratio"].append(("cache_hit_ratio", _labels(cache=name), round(cache.hits / lookups, 4) if lookups else 0))
+        cache_samples["size"].append(("cache_entries", _labels(cache=name), len(cache)))
+    lines += _metric("cache_hits_total", "counter", "In-process cache hits.", cache_samples["hits"])
+    lines += _metric("cache_misses_total", "counter", "In-process cache misses.", cache_samples["misses"])
+    lines += _metric("cache_hit_ratio", "gauge", "In-process cache hits over lookups since start.", cache_samples["ratio"])
+    lines += _metric("cache_entries", "gauge", "Entries held by each in-process cache.", cache_samples["size"])
+
+    lines += _metric("stream_subscribers", "gauge", "Open /stream connections in this process.", [
+        ("stream_subscribers", "", broker.subscriber_count())
+    ])
+    return "\n".join(lines) + "\n"
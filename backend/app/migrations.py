@@ -0,0 +1,110 @@
+"""
+Schema migrations for the Project Management Dashboard.
+
+``Base.metadata.create_all`` only creates tables that do not exist yet, so
+columns and indexes added to existing tables are applied here as well, and
+newly added rollup tables are backfilled. Every step is idempotent. The app
+does not migrate on startup; run ``python -m app.migrations`` once per deploy,
+before the server starts.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from .database import Base, engine, advisory_lock
+from . import models  # noqa: F401  (registers the tables on Base.metadata)
+from .timesheets import rebuild_timesheets
+from .search import create_search_index
+
+
+def add_missing_columns(connection: Connection):
+    """Add columns declared on the models to existing tables that lack them.
+
+    Only columns that are nullable or carry a server default can be added
+    this way, which is how new columns are declared.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column.type.compile(connection.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            connection.execute(text(ddl))
+
+
+def require_time_log_dates(connection: Connection):
+    """Make ``time_logs.date`` NOT NULL, dating undated logs by when they were created.
+
+    SQLite can't alter a column's nullability, so there the table is rebuilt.
+    """
+    columns = {column["name"]: column for column in inspect(connection).get_columns("time_logs")}
+    if not columns["date"]["nullable"]:
+        return
+    connection.execute(text("UPDATE time_logs SET date = coalesce(created_at, CURRENT_TIMESTAMP) WHERE date IS NULL"))
+    if connection.dialect.name != "sqlite":
+        connection.execute(text("ALTER TABLE time_logs ALTER COLUMN date SET NOT NULL"))
+        return
+
+    table = models.TimeLog.__table__
+    names = ", ".join(f'"{column.name}"' for column in table.columns)
+    connection.execute(text("ALTER TABLE time_logs RENAME TO time_logs_nullable_date"))
+    for index in inspect(connection).get_indexes("time_logs_nullable_date"):
+        connection.execute(text(f'DROP INDEX "{index["name"]}"'))
+    table.create(connection)
+    connection.execute(text(f"INSERT INTO time_logs ({names}) SELECT {names} FROM time_logs_nullable_date"))
+    connection.execute(text("DROP TABLE time_logs_nullable_date"))
+
+
+def create_missing_indexes(connection: Connection):
+    """Create any index declared on the models that is missing in the database."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            # IF NOT EXISTS instead of checkfirst, which cannot see expression indexes
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+# Arbitrary application-wide key serializing concurrent migration runs
+MIGRATION_LOCK_KEY = 8_140_002
+
+
+def run_migrations(bind: Engine = engine):
+    """Bring the database schema up to date with the models."""
+    with advisory_lock(bind, MIGRATION_LOCK_KEY):
+        _migrate(bind)
+
+
+def _migrate(bind: Engine):
+    existing_tables = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        add_missing_columns(connection)
+        if "time_logs" in existing_tables:
+            require_time_log_dates(connection)
+        create_missing_indexes(connection)
+        create_search_index(connection)
+
+    # Backfill rollup tables added to a database that already has time logs
+    if "time_logs" in existing_tables and "timesheet_weeks" not in existing_tables:
+        with Session(bind) as db:
+            rebuild_timesheets(db)
+            db.commit()
+
+
+def main():
+    """Apply migrations from the command line, before the app starts."""
+    run_migrations()
+    print("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, Index, JSON, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 import enum
+from datetime import datetime
 
 class TaskStatus(str, enum.Enum):
     TODO = "todo"
@@ -20,6 +21,9 @@ class TaskPriority(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_is_active_username_id", "is_active", "username", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
@@ -34,6 +38,12 @@ class User(Base):
     projects = relationship("Project", back_populates="owner")
     tasks = relationship("Task", back_populates="assignee")
 
+# Case-insensitive prefix lookups for user suggestions; text_pattern_ops lets
+# Postgres use them for LIKE 'prefix%' under any collation
+Index("ix_users_lower_username", func.lower(User.username).label("lower_username"), postgresql_ops={"lower_username": "text_pattern_ops"})
+Index("ix_users_lower_full_name", func.lower(User.full_name).label("lower_full_name"), postgresql_ops={"lower_full_name": "text_pattern_ops"})
+Index("ix_users_lower_email", func.lower(User.email).label("lower_email"), postgresql_ops={"lower_email": "text_pattern_ops"})
+
 class Project(Base):
     __tablename__ = "projects"
 
@@ -46,14 +56,40 @@ class Project(Base):
     owner_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
     # Relationships
     owner = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project")
     comments = relationship("Comment", back_populates="project")
+    stats = relationship("ProjectStats", back_populates="project", uselist=False, cascade="all, delete-orphan")
+
+class ProjectStats(Base):
+    """Denormalized per-project task counters, maintained on every task write."""
+    __tablename__ = "project_stats"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    total_tasks = Column(Integer, nullable=False, default=0)
+    todo_tasks = Column(Integer, nullable=False, default=0)
+    in_progress_tasks = Column(Integer, nullable=False, default=0)
+    review_tasks = Column(Integer, nullable=False, default=0)
+    ready_to_test_tasks = Column(Integer, nullable=False, default=0)
+    in_test_tasks = Column(Integer, nullable=False, default=0)
+    closed_tasks = Column(Integer, nullable=False, default=0)
+    total_estimated_hours = Column(Integer, nullable=False, default=0)
+    total_actual_hours = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
+
+    # Relationships
+    project = relationship("Project", back_populates="stats")
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_project_id_id", "project_id", "id"),
+        Index("ix_tasks_assignee_id_id", "assignee_id", "id"),
+        Index("ix_tasks_project_id_status_id", "project_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -66,6 +102,8 @@ class Task(Base):
     assignee_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE, including bulk and Core ones; feeds ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
     # Relationships
     project = relationship("Project", back_populates="tasks")
@@ -76,19 +114,54 @@ class Task(Base):
 
 class TimeLog(Base):
     __tablename__ = "time_logs"
+    __table_args__ = (
+        Index("ix_time_logs_date_id", "date", "id"),
+        Index("ix_time_logs_user_id_date", "user_id", "date"),
+        Index("ix_time_logs_task_id_date", "task_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
     hours = Column(Integer)
     description = Column(Text)
-    date = Column(DateTime)
+    # Leads the keyset sort keys of time log listings, so it can't be NULL
+    date = Column(DateTime, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     task = relationship("Task", back_populates="time_logs")
     user = relationship("User")
 
+class TimesheetWeek(Base):
+    """Hours logged per user, task and ISO week, maintained on every time-log write."""
+    __tablename__ = "timesheet_weeks"
+    __table_args__ = (
+        Index("ix_timesheet_weeks_project_id_week", "project_id", "iso_year", "iso_week"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    iso_year = Column(Integer, primary_key=True)
+    iso_week = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"))
+    hours = Column(Integer, nullable=False, default=0)
+
+
+class TimesheetMonth(Base):
+    """Hours logged per user, project and calendar month."""
+    __tablename__ = "timesheet_months"
+    __table_args__ = (
+        Index("ix_timesheet_months_project_id_month", "project_id", "year", "month"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    hours = Column(Integer, nullable=False, default=0)
+
+
 class Comment(Base):
     __tablename__ = "comments"
 
@@ -103,4 +176,34 @@ class Comment(Base):
     # Relationships
     user = relationship("User")
     task = relationship("Task", back_populates="comments")
-    project = relationship("Project", back_populates="comments") 
\ No newline at end of file
+    project = relationship("Project", back_populates="comments")
+
+class EmailOutbox(Base):
+    """Notification emails waiting to be delivered by the outbox worker."""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    template = Column(String, nullable=False)  # task_assignment, task_update, task_completion
+    context = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime)
+
+
+class ChangeLog(Base):
+    """Append-only record of row changes; ``seq`` orders them for delta sync."""
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)  # project, task, comment, time_log
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # created, updated, deleted
+    project_id = Column(Integer)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,89 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+Results are ordered by a tuple of sort keys ending in the primary key. The
+cursor is an opaque, URL-safe encoding of the last row's key values, so the
+next page is a range scan on a composite index instead of an OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor string."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_value(key, value: Any) -> Any:
+    """A cursor value as the key column's Python type; ValueError if it isn't one."""
+    if value is None:
+        return None
+    if isinstance(key.type, DateTime):
+        return datetime.fromisoformat(value)
+    try:
+        expected = key.type.python_type
+    except NotImplementedError:
+        return value
+    # bool is an int, but never a valid integer key
+    if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+        raise ValueError(f"cursor value does not match {key.key}")
+    return value
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor`` for the given sort keys."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("cursor does not match sort keys")
+        return [_decode_value(key, value) for key, value in zip(keys, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(
+    query: Query,
+    keys: Sequence,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> Tuple[list, Optional[str]]:
+    """Order ``query`` by ``keys`` and fetch one page.
+
+    When ``cursor`` is given the page starts right after it; otherwise the
+    legacy ``skip`` offset is applied. Returns the rows and the cursor for the
+    next page, or ``None`` when there are no more rows.
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="limit must be at least 1")
+    query = query.order_by(*keys)
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        query = query.filter(tuple_(*keys) > tuple_(*values))
+    elif skip:
+        query = query.offset(skip)
+
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Expose the next page cursor on the response headers."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
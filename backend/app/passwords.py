@@ -0,0 +1,91 @@
+"""
+Password hashing off the request path.
+
+bcrypt is deliberately CPU-heavy, so hashing and verification run in a
+bounded process pool rather than on the interpreter serving requests. This
+module must stay free of application imports: pool workers import it on
+start-up.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Number of hashing processes; 0 hashes inline on the calling thread
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Maximum hash/verify operations in flight (queued or running) per process
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "8"))
+
+# Pinning min/max rounds to the configured cost makes passlib flag any hash
+# with a different cost factor, so it is transparently rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_workers = PASSWORD_HASH_WORKERS
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_CONCURRENCY)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _run(fn, *args):
+    with _slots:
+        if _workers <= 0:
+            return fn(*args)
+        return _get_executor().submit(fn, *args).result()
+
+
+def configure_pool(workers: Optional[int] = None, concurrency: Optional[int] = None):
+    """Resize the hashing pool; the new pool starts on next use."""
+    global _workers, _slots
+    shutdown_pool()
+    if workers is not None:
+        _workers = workers
+    if concurrency is not None:
+        _slots = threading.BoundedSemaphore(concurrency)
+
+
+def shutdown_pool():
+    """Stop the hashing processes, if any were started."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with the configured bcrypt cost."""
+    return _run(_hash, password)
+
+
+def verify_and_update_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash when the stored one uses an outdated cost."""
+    return _run(_verify_and_update, password, hashed_password)
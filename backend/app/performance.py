@@ -0,0 +1,136 @@
+"""
+Performance metrics engine for the dashboard.
+
+Every number reported by ``/performance-metrics`` is computed with a fixed
+number of grouped SQL queries, independent of how many projects or tasks
+exist.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, case, cast, extract, Integer, Float, literal
+from sqlalchemy.orm import Session
+from .models import Task, Project, ProjectStats, TimeLog, TaskStatus
+from .project_stats import compute_project_stats
+
+TREND_DAYS = 7
+
+
+def _days_between(start, end, dialect: str):
+    """SQL expression for the number of days between two timestamps (fractional)."""
+    if dialect == "sqlite":
+        return func.julianday(end) - func.julianday(start)
+    return extract("epoch", end - start) / 86400.0
+
+
+def _whole_days_between(start, end, dialect: str):
+    """SQL expression for the whole number of days between two timestamps.
+
+    Rounds down like ``timedelta.days``, so an end just before its start is -1.
+    """
+    days = _days_between(start, end, dialect)
+    if dialect == "sqlite":
+        # CAST truncates toward zero, and floor() is not always compiled in
+        truncated = cast(days, Integer)
+        return truncated - case((days < truncated, 1), else_=0)
+    return func.floor(days)
+
+
+def _health_status(completion_rate: float, total_tasks: int) -> str:
+    if total_tasks == 0:
+        return "no_tasks"
+    if completion_rate >= 70:
+        return "healthy"
+    if completion_rate >= 40:
+        return "warning"
+    return "critical"
+
+
+def compute_performance_metrics(db: Session, now: Optional[datetime] = None) -> dict:
+    """Compute the dashboard performance metrics with a fixed number of aggregate queries."""
+    dialect = db.get_bind().dialect.name
+    now = now or datetime.utcnow()
+    week_ago = now - timedelta(days=TREND_DAYS)
+
+    is_closed = Task.status == TaskStatus.CLOSED
+    completion_days = _whole_days_between(Task.created_at, Task.updated_at, dialect)
+    valid_completion = (
+        is_closed
+        & Task.created_at.isnot(None)
+        & Task.updated_at.isnot(None)
+        & (completion_days >= 0)
+    )
+
+    # 1. Task totals, weekly completions and average completion time
+    totals = db.query(
+        func.count(Task.id).label("total_tasks"),
+        func.sum(case((is_closed, 1), else_=0)).label("completed_tasks"),
+        func.sum(case((is_closed & (Task.updated_at >= week_ago), 1), else_=0)).label("completed_this_week"),
+        func.avg(case((valid_completion, cast(completion_days, Float)), else_=None)).label("avg_completion_days"),
+    ).one()
+
+    total_tasks = totals.total_tasks or 0
+    completed_tasks_count = int(totals.completed_tasks or 0)
+    avg_completion_days = round(float(totals.avg_completion_days), 1) if totals.avg_completion_days is not None else 0
+    productivity_score = round((completed_tasks_count / total_tasks * 100), 1) if total_tasks > 0 else 0
+
+    # 2. Project health, read from the maintained project stats
+    project_rows = db.query(
+        Project.id,
+        Project.title,
+        ProjectStats.total_tasks,
+        ProjectStats.closed_tasks
+    ).outerjoin(ProjectStats, ProjectStats.project_id == Project.id).order_by(Project.id).all()
+    missing = [row.id for row in project_rows if row.total_tasks is None]
+    missing_stats = compute_project_stats(db, missing) if missing else {}
+
+    project_health = []
+    for row in project_rows:
+        if row.id in missing_stats:
+            total_project_tasks = missing_stats[row.id]["total_tasks"]
+            completed_project_tasks = missing_stats[row.id]["closed_tasks"]
+        else:
+            total_project_tasks = row.total_tasks
+            completed_project_tasks = row.closed_tasks
+        completion_rate = round((completed_project_tasks / total_project_tasks * 100), 1) if total_project_tasks > 0 else 0
+        project_health.append({
+            "project_id": row.id,
+            "project_title": row.title,
+            "completion_rate": completion_rate,
+            "total_tasks": total_project_tasks,
+            "completed_tasks": completed_project_tasks,
+            "health_status": _health_status(completion_rate, total_project_tasks)
+        })
+
+    # 3. Time tracking totals
+    total_logged_hours = db.query(func.sum(TimeLog.hours)).scalar() or 0
+    avg_hours_per_task = round(total_logged_hours / total_tasks, 1) if total_tasks > 0 else 0
+
+    # 4. Weekly trend, tasks closed per day bucket since a week ago
+    day_bucket = _whole_days_between(literal(week_ago), Task.updated_at, dialect).label("day_bucket")
+    bucket_rows = db.query(day_bucket, func.count(Task.id)).filter(
+        is_closed,
+        Task.updated_at >= week_ago,
+        Task.updated_at < week_ago + timedelta(days=TREND_DAYS)
+    ).group_by(day_bucket).all()
+    completed_by_bucket = {int(bucket): count for bucket, count in bucket_rows if bucket is not None}
+
+    weekly_trends = []
+    for i in range(TREND_DAYS):
+        day_start = week_ago + timedelta(days=i)
+        weekly_trends.append({
+            "day": day_start.strftime("%A"),
+            "completed": completed_by_bucket.get(i, 0)
+        })
+
+    return {
+        "tasks_completed_this_week": int(totals.completed_this_week or 0),
+        "avg_completion_days": avg_completion_days,
+        "productivity_score": productivity_score,
+        "project_health": project_health,
+        "total_logged_hours": total_logged_hours,
+        "avg_hours_per_task": avg_hours_per_task,
+        "weekly_trends": weekly_trends,
+        "total_tasks": total_tasks,
+        "completed_tasks": completed_tasks_count
+    }
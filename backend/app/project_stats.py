@@ -0,0 +1,208 @@
+"""
+Incrementally maintained per-project task counters.
+
+Task and time-log writes call ``record_task_change`` (``record_task_changes``
+for bulk writes, or ``record_actual_hours_change``) inside their own transaction, so the
+``project_stats`` row always moves together with the tasks it describes.
+``rebuild_project_stats`` recomputes everything from the tasks table and
+reports any drift; run it with ``python -m app.project_stats``.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from .models import Project, Task, TaskStatus, ProjectStats
+from .timesheets import UPSERT_DIALECTS
+
+STATUS_FIELDS = {status: f"{status.value}_tasks" for status in TaskStatus}
+STATS_FIELDS = ["total_tasks", *STATUS_FIELDS.values(), "total_estimated_hours", "total_actual_hours"]
+
+
+class TaskSnapshot(NamedTuple):
+    project_id: Optional[int]
+    status: Optional[TaskStatus]
+    estimated_hours: int
+    actual_hours: int
+
+
+def snapshot_task(task: Task) -> TaskSnapshot:
+    """Capture the task fields that contribute to project stats."""
+    return TaskSnapshot(
+        project_id=task.project_id,
+        status=TaskStatus(task.status) if task.status else None,
+        estimated_hours=task.estimated_hours or 0,
+        actual_hours=task.actual_hours or 0
+    )
+
+
+def _contribution(snapshot: TaskSnapshot) -> Dict[str, int]:
+    contribution = {
+        "total_tasks": 1,
+        "total_estimated_hours": snapshot.estimated_hours,
+        "total_actual_hours": snapshot.actual_hours
+    }
+    if snapshot.status is not None:
+        contribution[STATUS_FIELDS[snapshot.status]] = 1
+    return contribution
+
+
+def record_task_change(db: Session, before: Optional[TaskSnapshot], after: Optional[TaskSnapshot]):
+    """Apply the stats delta for a task going from ``before`` to ``after``.
+
+    Pass ``before=None`` for a created task and ``after=None`` for a deleted
+    one. Must be called after the task change has been made on the session.
+    """
+    record_task_changes(db, [(before, after)])
+
+
+def record_task_changes(db: Session, changes: Iterable[Tuple[Optional[TaskSnapshot], Optional[TaskSnapshot]]]):
+    """Apply the combined stats delta of many ``(before, after)`` task changes."""
+    deltas = defaultdict(lambda: defaultdict(int))
+    for before, after in changes:
+        if before is not None:
+            for field, value in _contribution(before).items():
+                deltas[before.project_id][field] -= value
+        if after is not None:
+            for field, value in _contribution(after).items():
+                deltas[after.project_id][field] += value
+
+    db.flush()
+    for project_id, project_deltas in deltas.items():
+        _apply_delta(db, project_id, project_deltas)
+
+
+def record_actual_hours_change(db: Session, project_id: Optional[int], delta: int):
+    """Apply a change to a project's logged hours."""
+    db.flush()
+    _apply_delta(db, project_id, {"total_actual_hours": delta})
+
+
+def _apply_delta(db: Session, project_id: Optional[int], deltas: Dict[str, int]):
+    deltas = {field: value for field, value in deltas.items() if value}
+    if project_id is None or not deltas:
+        return
+
+    result = db.execute(
+        update(ProjectStats)
+        .where(ProjectStats.project_id == project_id)
+        .values({getattr(ProjectStats, field): getattr(ProjectStats, field) + value for field, value in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        _insert_stats(db, project_id, deltas)
+
+
+def _insert_stats(db: Session, project_id: int, deltas: Dict[str, int]):
+    """Create a project's missing stats row from its current tasks.
+
+    Another transaction may be creating the same row; if it wins, the row it
+    inserted is bumped by ``deltas`` instead, as the update would have been.
+    """
+    dialect_insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        rebuild_project_stats(db, [project_id])
+        return
+    table = ProjectStats.__table__
+    statement = dialect_insert(table).values(project_id=project_id, **compute_project_stats(db, [project_id])[project_id])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.project_id],
+        set_={
+            **{field: table.c[field] + value for field, value in deltas.items()},
+            "version": table.c.version + 1
+        }
+    ))
+
+
+def compute_project_stats(db: Session, project_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+    """Compute stats from the tasks table with a single grouped query."""
+    query = db.query(
+        Task.project_id,
+        Task.status,
+        func.count(Task.id),
+        func.coalesce(func.sum(Task.estimated_hours), 0),
+        func.coalesce(func.sum(Task.actual_hours), 0)
+    ).filter(Task.project_id.isnot(None))
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        query = query.filter(Task.project_id.in_(project_ids))
+
+    stats = {project_id: dict.fromkeys(STATS_FIELDS, 0) for project_id in project_ids or []}
+    for project_id, task_status, count, estimated_hours, actual_hours in query.group_by(Task.project_id, Task.status):
+        project_stats = stats.setdefault(project_id, dict.fromkeys(STATS_FIELDS, 0))
+        project_stats["total_tasks"] += count
+        project_stats["total_estimated_hours"] += int(estimated_hours)
+        project_stats["total_actual_hours"] += int(actual_hours)
+        if task_status is not None:
+            project_stats[STATUS_FIELDS[TaskStatus(task_status)]] += count
+    return stats
+
+
+def load_project_stats(db: Session, project_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """Read stats for the given projects, computing any that have no row yet."""
+    project_ids = list(project_ids)
+    stats = {
+        row.project_id: {field: getattr(row, field) for field in STATS_FIELDS}
+        for row in db.query(ProjectStats).filter(ProjectStats.project_id.in_(project_ids))
+    }
+    missing = [project_id for project_id in project_ids if project_id not in stats]
+    if missing:
+        stats.update(compute_project_stats(db, missing))
+    return stats
+
+
+def rebuild_project_stats(db: Session, project_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """Recompute stats from scratch and return the drift that was corrected.
+
+    Rebuilds every project when ``project_ids`` is not given. The caller is
+    responsible for committing.
+    """
+    if project_ids is None:
+        project_ids = [project_id for (project_id,) in db.query(Project.id)]
+    project_ids = list(project_ids)
+    actual = compute_project_stats(db, project_ids)
+    stored = {
+        row.project_id: row
+        for row in db.query(ProjectStats).filter(ProjectStats.project_id.in_(project_ids)).populate_existing()
+    }
+
+    drift = []
+    for project_id in project_ids:
+        row = stored.get(project_id)
+        if row is None:
+            row = ProjectStats(project_id=project_id)
+            db.add(row)
+        for field in STATS_FIELDS:
+            stored_value = getattr(row, field)
+            if project_id in stored and stored_value != actual[project_id][field]:
+                drift.append({
+                    "project_id": project_id,
+                    "field": field,
+                    "stored": stored_value,
+                    "actual": actual[project_id][field]
+                })
+            setattr(row, field, actual[project_id][field])
+    db.flush()
+    return drift
+
+
+def main():
+    """Rebuild all project stats and report drift."""
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        drift = rebuild_project_stats(db)
+        db.commit()
+        for entry in drift:
+            print(f"Project {entry['project_id']}: {entry['field']} was {entry['stored']}, now {entry['actual']}")
+        print(f"Rebuilt project stats, {len(drift)} drifted value(s) corrected.")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
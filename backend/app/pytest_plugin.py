@@ -0,0 +1,36 @@
+"""
+Pytest fixtures for holding endpoints to a SQL query budget.
+
+Enable with ``pytest_plugins = ["app.pytest_plugin"]`` in a ``conftest.py``.
+Under the plugin a repeated statement fails the request (``QUERY_REPEAT_MODE``
+defaults to ``raise``), and ``query_budget`` bounds the statements a block
+may run::
+
+    def test_board(client, query_budget):
+        with query_budget(3):
+            client.get("/projects/1/board")
+"""
+
+import os
+from contextlib import contextmanager
+import pytest
+from . import query_stats
+
+
+def pytest_configure(config):
+    query_stats.QUERY_REPEAT_MODE = os.getenv("QUERY_REPEAT_MODE", "raise")
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager factory failing the test when a block exceeds ``max_queries``."""
+
+    @contextmanager
+    def budget(max_queries: int):
+        with query_stats.capture_queries() as stats:
+            yield stats
+        if stats.count > max_queries:
+            statements = "\n".join(f"  {statement}" for statement in stats.statements)
+            pytest.fail(f"{stats.count} queries ran, budget is {max_queries}:\n{statements}")
+
+    return budget
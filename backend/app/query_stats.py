@@ -0,0 +1,125 @@
+"""
+Per-request SQL statement counting and N+1 detection.
+
+Engine events attribute every statement to the request being served (via a
+context variable, so sync handlers running in the threadpool and async
+handlers are both covered). ``QueryStatsMiddleware`` reports the totals in a
+``Server-Timing`` header, e.g. ``db;desc="7 queries";dur=3.2``.
+
+A statement template (the SQL text with its bound parameters left out) that
+runs ``QUERY_REPEAT_THRESHOLD`` times within one request is almost always a
+query issued from a loop. ``QUERY_REPEAT_MODE`` decides what happens then:
+``warn`` logs it, ``raise`` fails the request with ``RepeatedQueryError``
+(the default under the pytest plugin in ``app.pytest_plugin``) and ``off``
+only counts.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+QUERY_REPEAT_MODE = os.getenv("QUERY_REPEAT_MODE", "warn")
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class RepeatedQueryError(RuntimeError):
+    """A statement template ran more often than ``QUERY_REPEAT_THRESHOLD`` allows."""
+
+
+class QueryStats:
+    """Statements executed within one request or ``capture_queries`` block."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: List[str] = []
+        self.templates: Counter = Counter()
+
+    def record(self, statement: str, duration: float, executemany: bool = False):
+        self.count += 1
+        self.duration += duration
+        self.statements.append(statement)
+        if not executemany:
+            # Batched executions (insertmanyvalues) repeat by design
+            self.templates[statement] += 1
+
+    def repeated(self, threshold: int = None) -> List[tuple]:
+        """``(template, count)`` pairs that reached the repeat threshold."""
+        threshold = threshold or QUERY_REPEAT_THRESHOLD
+        return [(statement, count) for statement, count in self.templates.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;desc="{self.count} queries";dur={self.duration * 1000:.1f}'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Process-wide collectors, for tests that drive the app from another thread
+_captures: List[QueryStats] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    for stats in _captures:
+        stats.record(statement, duration, executemany)
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.record(statement, duration, executemany)
+    if QUERY_REPEAT_MODE == "raise" and stats.templates[statement] == QUERY_REPEAT_THRESHOLD:
+        raise RepeatedQueryError(f"Statement ran {QUERY_REPEAT_THRESHOLD} times in one request: {statement}")
+
+
+@contextmanager
+def capture_queries():
+    """Collect every statement executed by any thread until the block exits."""
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+class QueryStatsMiddleware:
+    """Counts each request's statements and reports them in ``Server-Timing``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER.lower().encode(), stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if QUERY_REPEAT_MODE == "warn":
+                for statement, count in stats.repeated():
+                    logger.warning(f"Possible N+1 on {scope['method']} {scope['path']}: ran {count} times: {statement}")
@@ -6,11 +6,12 @@ from ..database import get_db
 from ..models import User
 from ..schemas.user import UserCreate, User as UserSchema, Token
 from ..auth import (
-    verify_password, 
+    verify_and_update_password, 
     get_password_hash, 
     create_access_token, 
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from ..user_suggest import invalidate_suggestions
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -43,6 +44,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_suggestions()
     return db_user
 
 @router.post("/login", response_model=Token)
@@ -50,13 +52,19 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     """Login user and return access token."""
     # Find user by username
     user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Rehash transparently when the bcrypt cost factor has changed
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
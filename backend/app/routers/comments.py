@@ -5,9 +5,16 @@ from ..database import get_db
 from ..models import Comment, User, Task, Project
 from ..schemas.task import CommentCreate, Comment as CommentSchema, CommentUpdate
 from ..auth import get_current_active_user
+from ..changes import record_change, comment_payload
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
+def _comment_project_id(db: Session, comment: Comment):
+    """Project a comment belongs to, directly or through its task."""
+    if comment.project_id is not None or comment.task_id is None:
+        return comment.project_id
+    return db.query(Task.project_id).filter(Task.id == comment.task_id).scalar()
+
 @router.post("/", response_model=CommentSchema)
 def create_comment(
     comment: CommentCreate,
@@ -47,6 +54,8 @@ def create_comment(
         project_id=comment.project_id
     )
     db.add(db_comment)
+    db.flush()
+    record_change(db, "comment", db_comment.id, "created", task.project_id if comment.task_id else comment.project_id, comment_payload(db_comment))
     db.commit()
     db.refresh(db_comment)
     
@@ -107,6 +116,7 @@ def update_comment(
         raise HTTPException(status_code=403, detail="Not authorized to update this comment")
     
     db_comment.content = comment_update.content
+    record_change(db, "comment", db_comment.id, "updated", _comment_project_id(db, db_comment), comment_payload(db_comment))
     db.commit()
     db.refresh(db_comment)
     
@@ -129,6 +139,7 @@ def delete_comment(
     if db_comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
     
+    record_change(db, "comment", db_comment.id, "deleted", _comment_project_id(db, db_comment))
     db.delete(db_comment)
     db.commit()
     return {"message": "Comment deleted successfully"} 
\ No newline at end of file
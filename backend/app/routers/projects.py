@@ -1,23 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List
 from ..database import get_db
-from ..models import Project, User, Task
+from ..models import Project, User, Task, TaskStatus, ProjectStats
 from ..schemas.project import ProjectCreate, Project as ProjectSchema, ProjectUpdate
-from ..schemas.task import Task as TaskSchema
+from ..schemas.task import Task as TaskSchema, Board as BoardSchema, BoardColumn as BoardColumnSchema
 from ..auth import get_current_active_user
+from ..project_stats import load_project_stats, STATUS_FIELDS
+from ..pagination import paginate, set_next_cursor, encode_cursor
+from ..changes import record_change, comment_payload, project_payload
+from ..etag import make_etag, etag_matches, not_modified, set_etag, list_etag
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 @router.get("/", response_model=List[ProjectSchema])
 def get_projects(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get all projects in the system (globally visible)."""
-    projects = db.query(Project).offset(skip).limit(limit).all()
+    etag = list_etag(db.query(Project), Project, skip, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    projects, next_cursor = paginate(db.query(Project), [Project.id], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
     return projects
 
 @router.post("/", response_model=ProjectSchema)
@@ -27,8 +40,10 @@ def create_project(
     db: Session = Depends(get_db)
 ):
     """Create a new project."""
-    db_project = Project(**project.dict(), owner_id=current_user.id)
+    db_project = Project(**project.dict(), owner_id=current_user.id, stats=ProjectStats())
     db.add(db_project)
+    db.flush()
+    record_change(db, "project", db_project.id, "created", db_project.id, project_payload(db_project))
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -36,6 +51,8 @@ def create_project(
 @router.get("/{project_id}", response_model=ProjectSchema)
 def get_project(
     project_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -43,6 +60,10 @@ def get_project(
     project = db.query(Project).filter(Project.id == project_id).first()
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
+    etag = make_etag("project", project.id, project.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return project
 
 @router.put("/{project_id}", response_model=ProjectSchema)
@@ -64,6 +85,7 @@ def update_project(
     for field, value in update_data.items():
         setattr(db_project, field, value)
     
+    record_change(db, "project", db_project.id, "updated", db_project.id, project_payload(db_project))
     db.commit()
     db.refresh(db_project)
     return db_project
@@ -83,14 +105,18 @@ def delete_project(
         raise HTTPException(status_code=404, detail="Project not found or you don't have permission to delete it")
     
     db.delete(db_project)
+    record_change(db, "project", project_id, "deleted", project_id)
     db.commit()
     return {"message": "Project deleted successfully"}
 
 @router.get("/{project_id}/tasks", response_model=List[TaskSchema])
 def get_project_tasks(
     project_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -103,72 +129,150 @@ def get_project_tasks(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    tasks = db.query(Task).filter(
-        Task.project_id == project_id
-    ).offset(skip).limit(limit).all()
+    query = db.query(Task).filter(Task.project_id == project_id)
+    etag = list_etag(query, Task, project_id, skip, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    tasks, next_cursor = paginate(query, [Task.id], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
     
     return tasks
 
 @router.get("/{project_id}/summary")
 def get_project_summary(
     project_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get project summary with task statistics."""
-    # Verify project ownership
-    project = db.query(Project).filter(
+    # Verify project ownership, reading the stats version alongside
+    row = db.query(Project, ProjectStats.version).outerjoin(ProjectStats).filter(
         Project.id == project_id,
         Project.owner_id == current_user.id
     ).first()
-    if not project:
+    if not row:
         raise HTTPException(status_code=404, detail="Project not found")
+    project, stats_version = row
+    
+    # Without a stats row the numbers are computed on the fly and carry no version
+    if stats_version is not None:
+        etag = make_etag("project-summary", project_id, project.version, stats_version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
     
-    # Get task statistics
-    total_tasks = db.query(Task).filter(Task.project_id == project_id).count()
-    todo_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == "todo"
-    ).count()
-    in_progress_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == "in_progress"
-    ).count()
-    review_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == "review"
-    ).count()
-    ready_to_test_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == "ready_to_test"
-    ).count()
-    in_test_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == "in_test"
-    ).count()
-    closed_tasks = db.query(Task).filter(
-        Task.project_id == project_id,
-        Task.status == "closed"
-    ).count()
-    
-    # Calculate total estimated and actual hours
-    tasks = db.query(Task).filter(Task.project_id == project_id).all()
-    total_estimated_hours = sum(task.estimated_hours or 0 for task in tasks)
-    total_actual_hours = sum(task.actual_hours or 0 for task in tasks)
+    # Read the incrementally maintained task statistics
+    stats = load_project_stats(db, [project_id])[project_id]
+    total_tasks = stats["total_tasks"]
     
     return {
         "project_id": project_id,
         "project_title": project.title,
         "total_tasks": total_tasks,
-        "todo_tasks": todo_tasks,
-        "in_progress_tasks": in_progress_tasks,
-        "review_tasks": review_tasks,
-        "ready_to_test_tasks": ready_to_test_tasks,
-        "in_test_tasks": in_test_tasks,
-        "closed_tasks": closed_tasks,
-        "completion_percentage": round((closed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2),
-        "total_estimated_hours": total_estimated_hours,
-        "total_actual_hours": total_actual_hours
+        "todo_tasks": stats["todo_tasks"],
+        "in_progress_tasks": stats["in_progress_tasks"],
+        "review_tasks": stats["review_tasks"],
+        "ready_to_test_tasks": stats["ready_to_test_tasks"],
+        "in_test_tasks": stats["in_test_tasks"],
+        "closed_tasks": stats["closed_tasks"],
+        "completion_percentage": round((stats["closed_tasks"] / total_tasks * 100) if total_tasks > 0 else 0, 2),
+        "total_estimated_hours": stats["total_estimated_hours"],
+        "total_actual_hours": stats["total_actual_hours"]
+    }
+
+# Kanban board: task cards grouped by status, each column paged on its own
+
+def _board_cards(db: Session, project_id: int):
+    """Lightweight card projection of a project's tasks."""
+    return db.query(
+        Task.id,
+        Task.title,
+        Task.priority,
+        Task.status,
+        func.coalesce(User.full_name, User.username).label("assignee_name")
+    ).outerjoin(User, Task.assignee_id == User.id).filter(Task.project_id == project_id)
+
+def _board_etag(db: Session, project_id: int, *params) -> str:
+    # Cards show assignee names, so renamed assignees change the board too
+    tasks = db.query(Task).outerjoin(User, Task.assignee_id == User.id).filter(Task.project_id == project_id)
+    return list_etag(tasks, Task, project_id, *params, aggregates=(func.max(User.updated_at),))
+
+def _ensure_project(db: Session, project_id: int):
+    if db.query(Project.id).filter(Project.id == project_id).first() is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+@router.get("/{project_id}/board", response_model=BoardSchema)
+def get_project_board(
+    project_id: int,
+    request: Request,
+    response: Response,
+    limit: int = 20,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the project's Kanban board, with up to ``limit`` cards per status column."""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    _ensure_project(db, project_id)
+    
+    etag = _board_etag(db, project_id, limit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    # Number the cards within each status and keep one extra per column to detect more
+    position = func.row_number().over(partition_by=Task.status, order_by=Task.id).label("position")
+    ranked = _board_cards(db, project_id).add_columns(position).subquery()
+    cards = {task_status: [] for task_status in TaskStatus}
+    for card in db.query(ranked).filter(ranked.c.position <= limit + 1).order_by(ranked.c.status, ranked.c.position):
+        if card.status is not None:
+            cards[TaskStatus(card.status)].append(card)
+    
+    stats = load_project_stats(db, [project_id])[project_id]
+    columns = []
+    for task_status, column_cards in cards.items():
+        columns.append({
+            "status": task_status,
+            "total": stats[STATUS_FIELDS[task_status]],
+            "tasks": column_cards[:limit],
+            "next_cursor": encode_cursor([column_cards[limit - 1].id]) if len(column_cards) > limit else None
+        })
+    
+    return {"project_id": project_id, "columns": columns}
+
+@router.get("/{project_id}/board/{task_status}", response_model=BoardColumnSchema)
+def get_project_board_column(
+    project_id: int,
+    task_status: TaskStatus,
+    request: Request,
+    response: Response,
+    limit: int = 20,
+    cursor: str = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the next page of cards for one board column."""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    _ensure_project(db, project_id)
+    
+    etag = _board_etag(db, project_id, task_status, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    query = _board_cards(db, project_id).filter(Task.status == task_status)
+    cards, next_cursor = paginate(query, [Task.id], cursor=cursor, limit=limit)
+    stats = load_project_stats(db, [project_id])[project_id]
+    
+    return {
+        "status": task_status,
+        "total": stats[STATUS_FIELDS[task_status]],
+        "tasks": cards,
+        "next_cursor": next_cursor
     }
 
 # Comment endpoints for projects
@@ -215,6 +319,8 @@ def create_project_comment(
         project_id=project_id
     )
     db.add(db_comment)
+    db.flush()
+    record_change(db, "comment", db_comment.id, "created", project_id, comment_payload(db_comment))
     db.commit()
     db.refresh(db_comment)
     
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from ..database import get_db
+from ..models import User
+from ..schemas.search import SearchResult
+from ..auth import get_current_active_user
+from ..search import search as search_index, search_available, SEARCH_KINDS, MAX_SEARCH_RESULTS
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("/", response_model=List[SearchResult])
+def search(
+    q: str,
+    types: str = ",".join(SEARCH_KINDS),
+    project_id: int = None,
+    limit: int = 20,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search task, project and comment text, best matches first.
+
+    Every word in ``q`` must match and the last one may be a prefix.
+    ``types`` is a comma-separated subset of task, project and comment.
+    Snippets are HTML-escaped, with matches wrapped in ``<mark>``.
+    """
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()]
+    unknown = set(kinds) - set(SEARCH_KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+    if not 1 <= limit <= MAX_SEARCH_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+    if not search_available(db):
+        raise HTTPException(status_code=501, detail="Full-text search is not available on this database")
+    return search_index(db, q, kinds, project_id=project_id, limit=limit)
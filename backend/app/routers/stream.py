@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+from fastapi import APIRouter, HTTPException, Request, Security
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from ..auth import authenticate_token
+from ..database import SessionLocal
+from ..events import broker
+from ..models import Project
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+# Seconds between keep-alive comments on an idle stream
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+def _authorize(token: str, project_id: int):
+    # A short-lived session, so an open stream does not hold a pooled connection
+    with SessionLocal() as db:
+        principal = authenticate_token(token, db)
+        if not principal.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        if db.query(Project.id).filter(Project.id == project_id).first() is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+    return principal
+
+
+def _format_event(change: dict) -> str:
+    # The change-log seq doubles as the event id
+    return f"id: {change['seq']}\nevent: {change['entity']}.{change['op']}\ndata: {json.dumps(change, default=str)}\n\n"
+
+
+@router.get("/projects/{project_id}")
+async def stream_project_changes(
+    project_id: int,
+    request: Request,
+    access_token: str = None,
+    credentials: HTTPAuthorizationCredentials = Security(optional_bearer)
+):
+    """Server-sent events for task, comment and time-log changes in a project.
+
+    Browsers' ``EventSource`` cannot set headers, so the bearer token may also
+    be passed as the ``access_token`` query parameter.
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    await run_in_threadpool(_authorize, token, project_id)
+
+    async def events():
+        async with broker.subscribe(project_id) as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_event(change)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
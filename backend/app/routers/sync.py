@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+import os
+from ..database import get_db
+from ..models import ChangeLog, Project, Task, Comment, TimeLog, User
+from ..schemas.sync import SyncResponse
+from ..auth import get_current_active_user
+from ..pagination import encode_cursor, decode_cursor
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "500"))
+
+# Change-log entity name -> (model, loader options, parent columns, response collection).
+# Rows whose parent columns are all NULL were detached by a delete and are
+# reported as deleted.
+SYNC_ENTITIES = {
+    "project": (Project, [], [], "projects"),
+    "task": (Task, [joinedload(Task.assignee)], ["project_id"], "tasks"),
+    "comment": (Comment, [joinedload(Comment.user)], ["task_id", "project_id"], "comments"),
+    "time_log": (TimeLog, [], ["task_id"], "time_logs")
+}
+
+@router.get("/", response_model=SyncResponse)
+def sync_changes(
+    since: str = None,
+    limit: int = SYNC_PAGE_SIZE,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get projects, tasks, comments and time logs changed since a sync token.
+
+    Call without ``since`` after a full load to get the starting token. Each
+    response carries the token for the next call; keep calling while
+    ``has_more`` is true. ``reset`` means the token is older than the
+    retained history and the client must reload everything.
+    """
+    if since is None:
+        latest = db.query(func.max(ChangeLog.seq)).scalar() or 0
+        return {"token": encode_cursor([latest])}
+    
+    (since_seq,) = decode_cursor(since, [ChangeLog.seq])
+    oldest = db.query(func.min(ChangeLog.seq)).scalar()
+    if oldest is not None and since_seq < oldest - 1:
+        latest = db.query(func.max(ChangeLog.seq)).scalar()
+        return {"token": encode_cursor([latest]), "reset": True}
+    
+    entries = db.query(ChangeLog).filter(ChangeLog.seq > since_seq).order_by(ChangeLog.seq).limit(limit + 1).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return {"token": since}
+    
+    # Each changed row is sent once, in its current state
+    changed = dict.fromkeys((entry.entity, entry.entity_id) for entry in entries)
+    
+    changes = {collection: [] for *_, collection in SYNC_ENTITIES.values()}
+    deleted = {collection: [] for *_, collection in SYNC_ENTITIES.values()}
+    for entity, (model, options, parents, collection) in SYNC_ENTITIES.items():
+        ids = [entity_id for name, entity_id in changed if name == entity]
+        if not ids:
+            continue
+        rows = {row.id: row for row in db.query(model).options(*options).filter(model.id.in_(ids))}
+        for entity_id in ids:
+            row = rows.get(entity_id)
+            if row is None or (parents and all(getattr(row, parent) is None for parent in parents)):
+                deleted[collection].append(entity_id)
+            else:
+                changes[collection].append(row)
+    
+    for task in changes["tasks"]:
+        task.assignee_name = task.assignee.full_name if task.assignee else None
+        task.assignee_username = task.assignee.username if task.assignee else None
+    
+    return {
+        "token": encode_cursor([entries[-1].seq]),
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": deleted
+    }
@@ -1,24 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Security
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import List
-import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, select, insert, update, delete
+from typing import Dict, Iterable, List
 from datetime import datetime, timedelta
-from ..database import get_db
-from ..models import Task, User, TimeLog, Project
-from ..schemas.task import TaskCreate, Task as TaskSchema, TaskUpdate, TimeLogCreate, TimeLog as TimeLogSchema
+import os
+from ..database import get_db, get_async_db
+from ..models import Task, User, TimeLog, Project, Comment
+from ..schemas.task import (
+    TaskCreate, Task as TaskSchema, TaskUpdate, TimeLogCreate, TimeLog as TimeLogSchema,
+    TaskBulkUpdate, TaskBulkDelete, TaskBulkResult
+)
 from ..auth import get_current_active_user
-from ..email_service import send_task_assignment_email, send_task_update_email, send_task_completion_email
+from ..email_service import queue_task_assignment_email, queue_task_update_email, queue_task_completion_email, email_worker
+from ..project_stats import snapshot_task, record_task_change, record_task_changes
+from ..time_tracking import apply_time_log_change
+from ..timesheets import snapshot_time_log, record_time_log_changes, record_task_moves
+from ..pagination import paginate, set_next_cursor
+from ..export import export_response
+from ..changes import record_change, task_payload, comment_payload, time_log_payload
+from ..etag import make_etag, etag_matches, not_modified, set_etag, list_etag
 
 security = HTTPBearer()
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Largest number of tasks accepted by a single bulk request
+TASK_BULK_MAX_ITEMS = int(os.getenv("TASK_BULK_MAX_ITEMS", "500"))
+
 @router.get("/", response_model=List[TaskSchema])
 def get_tasks(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     project_id: int = None,
     assignee_id: int = None,
     current_user: User = Depends(get_current_active_user),
@@ -27,7 +44,7 @@ def get_tasks(
     """Get all tasks in the system (globally visible)."""
     from sqlalchemy.orm import joinedload
     
-    query = db.query(Task).options(joinedload(Task.assignee))
+    query = db.query(Task)
     
     # Filter by project if specified
     if project_id:
@@ -41,7 +58,19 @@ def get_tasks(
     if assignee_id:
         query = query.filter(Task.assignee_id == assignee_id)
     
-    tasks = query.offset(skip).limit(limit).all()
+    # Answer revalidations from the watermark, before loading the page
+    etag = list_etag(
+        query.outerjoin(User, Task.assignee_id == User.id), Task,
+        project_id, assignee_id, skip, limit, cursor,
+        aggregates=(func.max(User.updated_at),)
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    query = query.options(joinedload(Task.assignee))
+    tasks, next_cursor = paginate(query, [Task.id], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
     
     # Add assignee information to each task
     for task in tasks:
@@ -58,11 +87,11 @@ def get_tasks(
 async def create_task(
     task: TaskCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new task in any project."""
     # Verify project exists (no ownership restriction)
-    project = db.query(Project).filter(Project.id == task.project_id).first()
+    project = await db.get(Project, task.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -73,29 +102,346 @@ async def create_task(
     
     db_task = Task(**task_data)
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.flush()
+    await db.run_sync(record_task_change, None, snapshot_task(db_task))
+    record_change(db, "task", db_task.id, "created", db_task.project_id, task_payload(db_task))
     
-    # Send email notification if task is assigned to someone other than the creator
+    # Queue email notification if task is assigned to someone other than the creator
     if db_task.assignee_id and db_task.assignee_id != current_user.id:
-        assignee = db.query(User).filter(User.id == db_task.assignee_id).first()
+        assignee = await db.get(User, db_task.assignee_id)
         if assignee and assignee.email:
-            # Send email notification asynchronously
-            asyncio.create_task(
-                send_task_assignment_email(
+            queue_task_assignment_email(
+                db,
+                user_email=assignee.email,
+                user_name=assignee.full_name or assignee.username,
+                task_title=db_task.title,
+                project_name=project.title,
+                assigned_by=current_user.full_name or current_user.username
+            )
+    
+    await db.commit()
+    await db.refresh(db_task)
+    email_worker.wake()
+    
+    return db_task
+
+@router.get("/my-tasks", response_model=List[TaskSchema])
+def get_my_tasks(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get all tasks assigned to the current user."""
+    query = db.query(Task).filter(Task.assignee_id == current_user.id)
+    etag = list_etag(query, Task, current_user.id, skip, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    tasks, next_cursor = paginate(query, [Task.id], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return tasks
+
+@router.get("/my-tasks/stats")
+def get_my_task_stats(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get task statistics for the current user by status."""
+    # Get tasks assigned to current user
+    user_tasks = db.query(Task).filter(Task.assignee_id == current_user.id)
+    
+    # Count by status using enum values
+    from ..models import TaskStatus
+    todo_count = user_tasks.filter(Task.status == TaskStatus.TODO).count()
+    in_progress_count = user_tasks.filter(Task.status == TaskStatus.IN_PROGRESS).count()
+    review_count = user_tasks.filter(Task.status == TaskStatus.REVIEW).count()
+    ready_to_test_count = user_tasks.filter(Task.status == TaskStatus.READY_TO_TEST).count()
+    in_test_count = user_tasks.filter(Task.status == TaskStatus.IN_TEST).count()
+    closed_count = user_tasks.filter(Task.status == TaskStatus.CLOSED).count()
+    
+    total_tasks = todo_count + in_progress_count + review_count + ready_to_test_count + in_test_count + closed_count
+    
+    return {
+        "user_id": current_user.id,
+        "username": current_user.username,
+        "total_tasks": total_tasks,
+        "todo": todo_count,
+        "in_progress": in_progress_count,
+        "review": review_count,
+        "ready_to_test": ready_to_test_count,
+        "in_test": in_test_count,
+        "closed": closed_count
+    }
+
+@router.get("/export")
+def export_tasks(
+    format: str = "csv",
+    project_id: int = None,
+    assignee_id: int = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream tasks as CSV or NDJSON."""
+    statement = select(
+        Task.id,
+        Task.title,
+        Task.description,
+        Task.status,
+        Task.priority,
+        Task.project_id,
+        Project.title.label("project_title"),
+        Task.assignee_id,
+        User.username.label("assignee_username"),
+        Task.estimated_hours,
+        Task.actual_hours,
+        Task.created_at,
+        Task.updated_at
+    ).join(Project, Task.project_id == Project.id).outerjoin(User, Task.assignee_id == User.id)
+    
+    if project_id:
+        statement = statement.where(Task.project_id == project_id)
+    if assignee_id:
+        statement = statement.where(Task.assignee_id == assignee_id)
+    
+    return export_response(statement.order_by(Task.id), format, "tasks")
+
+# Bulk endpoints: one validation query per referenced table, one write
+# statement per operation and a single commit for the whole batch
+
+def _check_bulk_size(items: list):
+    if len(items) > TASK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {TASK_BULK_MAX_ITEMS} tasks can be processed per request"
+        )
+
+def _load_by_id(db: Session, model, ids: Iterable[int]) -> Dict[int, object]:
+    ids = {id for id in ids if id is not None}
+    if not ids:
+        return {}
+    return {row.id: row for row in db.query(model).filter(model.id.in_(ids))}
+
+def _record_detached(db: Session, time_logs: Iterable, comments: Iterable, task_projects: Dict[int, int]):
+    """Record the time logs and comments a task delete detaches, so /sync clients drop the link."""
+    for time_log in time_logs:
+        record_change(
+            db, "time_log", time_log.id, "updated", task_projects[time_log.task_id],
+            {**time_log_payload(time_log), "task_id": None}
+        )
+    for comment in comments:
+        record_change(
+            db, "comment", comment.id, "updated", comment.project_id or task_projects[comment.task_id],
+            {**comment_payload(comment), "task_id": None}
+        )
+
+def _task_result(index: int, task: Task, assignee: User, status_code: int) -> TaskBulkResult:
+    task.assignee_name = assignee.full_name if assignee else None
+    task.assignee_username = assignee.username if assignee else None
+    return TaskBulkResult(index=index, id=task.id, status_code=status_code, task=TaskSchema.model_validate(task))
+
+@router.post("/bulk", response_model=List[TaskBulkResult])
+def bulk_create_tasks(
+    tasks: List[TaskCreate],
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many tasks in one transaction, returning a result per item."""
+    _check_bulk_size(tasks)
+    rows = [task.dict() for task in tasks]
+    for row in rows:
+        if not row.get('assignee_id'):
+            row['assignee_id'] = current_user.id
+    
+    projects = _load_by_id(db, Project, [row['project_id'] for row in rows])
+    assignees = _load_by_id(db, User, [row['assignee_id'] for row in rows])
+    
+    results = [None] * len(rows)
+    valid = []
+    for index, row in enumerate(rows):
+        if row['project_id'] not in projects:
+            results[index] = TaskBulkResult(index=index, status_code=404, detail="Project not found")
+        elif row['assignee_id'] not in assignees:
+            results[index] = TaskBulkResult(index=index, status_code=404, detail="Assignee not found")
+        else:
+            valid.append(index)
+    
+    if valid:
+        created = db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [rows[index] for index in valid]
+        ).all()
+        record_task_changes(db, [(None, snapshot_task(task)) for task in created])
+        for task in created:
+            record_change(db, "task", task.id, "created", task.project_id, task_payload(task))
+        
+        for index, task in zip(valid, created):
+            assignee = assignees[task.assignee_id]
+            if assignee.id != current_user.id and assignee.email:
+                queue_task_assignment_email(
+                    db,
                     user_email=assignee.email,
                     user_name=assignee.full_name or assignee.username,
-                    task_title=db_task.title,
-                    project_name=project.name,
+                    task_title=task.title,
+                    project_name=projects[task.project_id].title,
                     assigned_by=current_user.full_name or current_user.username
                 )
+            results[index] = _task_result(index, task, assignee, 201)
+        
+        db.commit()
+        email_worker.wake()
+    
+    return results
+
+@router.put("/bulk", response_model=List[TaskBulkResult])
+def bulk_update_tasks(
+    updates: List[TaskBulkUpdate],
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Update many tasks in one transaction, returning a result per item."""
+    from sqlalchemy.orm import joinedload
+    
+    _check_bulk_size(updates)
+    changes = [update_item.dict(exclude_unset=True) for update_item in updates]
+    old_tasks = {
+        row.id: row
+        for row in db.query(
+            Task.id, Task.project_id, Task.status, Task.estimated_hours, Task.actual_hours, Task.assignee_id
+        ).filter(Task.id.in_({change['id'] for change in changes}))
+    }
+    projects = _load_by_id(db, Project, [change.get('project_id') for change in changes])
+    assignees = _load_by_id(db, User, [change.get('assignee_id') for change in changes])
+    
+    results = [None] * len(changes)
+    valid = []
+    seen = set()
+    for index, change in enumerate(changes):
+        task_id = change['id']
+        if task_id not in old_tasks:
+            results[index] = TaskBulkResult(index=index, id=task_id, status_code=404, detail="Task not found")
+        elif task_id in seen:
+            results[index] = TaskBulkResult(index=index, id=task_id, status_code=400, detail="Task appears more than once in the request")
+        elif 'project_id' in change and change['project_id'] not in projects:
+            results[index] = TaskBulkResult(index=index, id=task_id, status_code=404, detail="Project not found")
+        elif change.get('assignee_id') is not None and change['assignee_id'] not in assignees:
+            results[index] = TaskBulkResult(index=index, id=task_id, status_code=404, detail="Assignee not found")
+        else:
+            valid.append(index)
+            seen.add(task_id)
+    
+    if valid:
+        # Bulk UPDATE by primary key, batched per distinct set of columns
+        db.execute(update(Task), [changes[index] for index in valid])
+        updated = {
+            task.id: task
+            for task in db.query(Task).options(joinedload(Task.assignee), joinedload(Task.project)).filter(
+                Task.id.in_([changes[index]['id'] for index in valid])
+            ).populate_existing()
+        }
+        record_task_changes(db, [
+            (snapshot_task(old_tasks[task_id]), snapshot_task(task)) for task_id, task in updated.items()
+        ])
+        record_task_moves(db, [
+            (task_id, old_tasks[task_id].project_id, task.project_id) for task_id, task in updated.items()
+        ])
+        
+        for index in valid:
+            change = changes[index]
+            task = updated[change['id']]
+            if old_tasks[task.id].project_id != task.project_id:
+                record_change(db, "task", task.id, "deleted", old_tasks[task.id].project_id)
+            record_change(db, "task", task.id, "updated", task.project_id, task_payload(task))
+            if 'assignee_id' in change and change['assignee_id'] != old_tasks[task.id].assignee_id:
+                # Notify the new assignee, as creating an assigned task does
+                assignee = assignees.get(change['assignee_id'])
+                if assignee and assignee.email:
+                    queue_task_assignment_email(
+                        db,
+                        user_email=assignee.email,
+                        user_name=assignee.full_name or assignee.username,
+                        task_title=task.title,
+                        project_name=task.project.title,
+                        assigned_by=current_user.full_name or current_user.username
+                    )
+            elif current_user.email:
+                changed_fields = [field.replace('_', ' ').title() for field in change if field != 'id']
+                queue_task_update_email(
+                    db,
+                    user_email=current_user.email,
+                    user_name=current_user.full_name or current_user.username,
+                    task_title=task.title,
+                    project_name=task.project.title,
+                    update_type=f"Bulk update: {', '.join(changed_fields)}",
+                    updated_by=current_user.full_name or current_user.username
+                )
+            results[index] = _task_result(index, task, task.assignee, 200)
+        
+        db.commit()
+        email_worker.wake()
+    
+    return results
+
+@router.delete("/bulk", response_model=List[TaskBulkResult])
+def bulk_delete_tasks(
+    request: TaskBulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many tasks in one transaction (only the project owner can delete)."""
+    _check_bulk_size(request.ids)
+    tasks = {
+        row.id: row
+        for row in db.query(
+            Task.id, Task.project_id, Task.status, Task.estimated_hours, Task.actual_hours, Project.owner_id
+        ).outerjoin(Project, Task.project_id == Project.id).filter(Task.id.in_(set(request.ids)))
+    }
+    
+    results = []
+    deletable = []
+    for index, task_id in enumerate(request.ids):
+        if task_id not in tasks:
+            results.append(TaskBulkResult(index=index, id=task_id, status_code=404, detail="Task not found"))
+        elif task_id in deletable:
+            results.append(TaskBulkResult(index=index, id=task_id, status_code=400, detail="Task appears more than once in the request"))
+        elif tasks[task_id].owner_id != current_user.id:
+            results.append(TaskBulkResult(index=index, id=task_id, status_code=403, detail="You don't have permission to delete this task"))
+        else:
+            deletable.append(task_id)
+            results.append(TaskBulkResult(index=index, id=task_id, status_code=200, detail="Task deleted successfully"))
+    
+    if deletable:
+        # Time logs and comments are detached from deleted tasks, as with a single delete
+        time_logs = db.query(TimeLog.id, TimeLog.user_id, TimeLog.task_id, TimeLog.date, TimeLog.hours).filter(
+            TimeLog.task_id.in_(deletable)
+        ).all()
+        comments = db.query(Comment.id, Comment.user_id, Comment.task_id, Comment.project_id, Comment.content).filter(
+            Comment.task_id.in_(deletable)
+        ).all()
+        record_time_log_changes(db, [
+            (snapshot_time_log(time_log, tasks[time_log.task_id].project_id), None) for time_log in time_logs
+        ])
+        _record_detached(db, time_logs, comments, {task_id: tasks[task_id].project_id for task_id in deletable})
+        for model in (TimeLog, Comment):
+            db.execute(
+                update(model).where(model.task_id.in_(deletable)).values(task_id=None)
+                .execution_options(synchronize_session=False)
             )
+        db.execute(delete(Task).where(Task.id.in_(deletable)).execution_options(synchronize_session=False))
+        record_task_changes(db, [(snapshot_task(tasks[task_id]), None) for task_id in deletable])
+        for task_id in deletable:
+            record_change(db, "task", task_id, "deleted", tasks[task_id].project_id)
+        db.commit()
     
-    return db_task
+    return results
 
 @router.get("/{task_id}", response_model=TaskSchema)
 def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -106,6 +452,12 @@ def get_task(
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    assignee_updated_at = task.assignee.updated_at if task.assignee else None
+    etag = make_etag("task", task.id, task.version, task.assignee_id, assignee_updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     # Add assignee information
     if task.assignee:
         task.assignee_name = task.assignee.full_name
@@ -137,16 +489,16 @@ async def update_task(
     task_id: int,
     task_update: TaskUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a task (project owner or task assignee can update)."""
     try:
-        db_task = db.query(Task).filter(Task.id == task_id).first()
+        db_task = await db.get(Task, task_id)
         if db_task is None:
             raise HTTPException(status_code=404, detail="Task not found")
         
         # Check if user can update this task (project owner or task assignee)
-        project = db.query(Project).filter(Project.id == db_task.project_id).first()
+        project = await db.get(Project, db_task.project_id)
         can_update = (project.owner_id == current_user.id or db_task.assignee_id == current_user.id)
         
         # For global visibility, allow anyone to update tasks
@@ -159,6 +511,7 @@ async def update_task(
         # Store old values for comparison
         old_assignee_id = db_task.assignee_id
         old_status = db_task.status
+        old_snapshot = snapshot_task(db_task)
         
         update_data = task_update.dict(exclude_unset=True)
         
@@ -169,10 +522,26 @@ async def update_task(
             if hasattr(db_task, field):
                 setattr(db_task, field, value)
         
-        db.commit()
-        db.refresh(db_task)
+        await db.run_sync(record_task_change, old_snapshot, snapshot_task(db_task))
+        await db.run_sync(record_task_moves, [(db_task.id, old_snapshot.project_id, db_task.project_id)])
+        if old_snapshot.project_id != db_task.project_id:
+            record_change(db, "task", db_task.id, "deleted", old_snapshot.project_id)
+        record_change(db, "task", db_task.id, "updated", db_task.project_id, task_payload(db_task))
+        
+        # Queue assignment email to new assignee
+        if 'assignee_id' in update_data and old_assignee_id != db_task.assignee_id and db_task.assignee_id:
+            assignee = await db.get(User, db_task.assignee_id)
+            if assignee and assignee.email:
+                queue_task_assignment_email(
+                    db,
+                    user_email=assignee.email,
+                    user_name=assignee.full_name or assignee.username,
+                    task_title=db_task.title,
+                    project_name=project.title,
+                    assigned_by=current_user.full_name or current_user.username
+                )
         
-        # Send email notifications for different update types
+        # Queue email notifications for different update types
         # Send email to the logged-in user for all updates
         
         if current_user.email:
@@ -184,15 +553,14 @@ async def update_task(
             if 'status' in update_data:
                 if db_task.status == "completed":
                     update_type = "Task Completed"
-                    # Send completion email
-                    asyncio.create_task(
-                        send_task_completion_email(
-                            user_email=current_user.email,
-                            user_name=current_user.full_name or current_user.username,
-                            task_title=db_task.title,
-                            project_name=project.title,
-                            completed_by=current_user.full_name or current_user.username
-                        )
+                    # Queue completion email
+                    queue_task_completion_email(
+                        db,
+                        user_email=current_user.email,
+                        user_name=current_user.full_name or current_user.username,
+                        task_title=db_task.title,
+                        project_name=project.title,
+                        completed_by=current_user.full_name or current_user.username
                     )
                 else:
                     changed_fields.append(f"Status to {db_task.status}")
@@ -214,16 +582,6 @@ async def update_task(
             
             if 'assignee_id' in update_data and old_assignee_id != db_task.assignee_id:
                 update_type = "Task Reassigned"
-                # Send assignment email to new assignee
-                asyncio.create_task(
-                    send_task_assignment_email(
-                        user_email=current_user.email,
-                        user_name=current_user.full_name or current_user.username,
-                        task_title=db_task.title,
-                        project_name=project.title,
-                        assigned_by=current_user.full_name or current_user.username
-                    )
-                )
             
             # Create update type from all changed fields
             if changed_fields:
@@ -232,20 +590,21 @@ async def update_task(
                 else:
                     update_type = f"Multiple fields updated: {', '.join(changed_fields)}"
             
-            # Send general update email for all other cases
+            # Queue general update email for all other cases
             if update_type != "Task Completed" and update_type != "Task Reassigned":
-
-                email_task = asyncio.create_task(
-                    send_task_update_email(
-                        user_email=current_user.email,
-                        user_name=current_user.full_name or current_user.username,
-                        task_title=db_task.title,
-                        project_name=project.title,
-                        update_type=update_type,
-                        updated_by=current_user.full_name or current_user.username
-                    )
+                queue_task_update_email(
+                    db,
+                    user_email=current_user.email,
+                    user_name=current_user.full_name or current_user.username,
+                    task_title=db_task.title,
+                    project_name=project.title,
+                    update_type=update_type,
+                    updated_by=current_user.full_name or current_user.username
                 )
-
+        
+        await db.commit()
+        await db.refresh(db_task)
+        email_worker.wake()
         
         return db_task
     except Exception as e:
@@ -270,55 +629,18 @@ def delete_task(
     if project.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="You don't have permission to delete this task")
     
+    old_snapshot = snapshot_task(db_task)
+    # The task's time logs are detached from it, so drop them from the timesheets
+    record_time_log_changes(db, [
+        (snapshot_time_log(time_log, db_task.project_id), None) for time_log in db_task.time_logs
+    ])
+    _record_detached(db, db_task.time_logs, db_task.comments, {db_task.id: db_task.project_id})
     db.delete(db_task)
+    record_task_change(db, old_snapshot, None)
+    record_change(db, "task", task_id, "deleted", old_snapshot.project_id)
     db.commit()
     return {"message": "Task deleted successfully"}
 
-@router.get("/my-tasks", response_model=List[TaskSchema])
-def get_my_tasks(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get all tasks assigned to the current user."""
-    tasks = db.query(Task).filter(
-        Task.assignee_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return tasks
-
-@router.get("/my-tasks/stats")
-def get_my_task_stats(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get task statistics for the current user by status."""
-    # Get tasks assigned to current user
-    user_tasks = db.query(Task).filter(Task.assignee_id == current_user.id)
-    
-    # Count by status using enum values
-    from ..models import TaskStatus
-    todo_count = user_tasks.filter(Task.status == TaskStatus.TODO).count()
-    in_progress_count = user_tasks.filter(Task.status == TaskStatus.IN_PROGRESS).count()
-    review_count = user_tasks.filter(Task.status == TaskStatus.REVIEW).count()
-    ready_to_test_count = user_tasks.filter(Task.status == TaskStatus.READY_TO_TEST).count()
-    in_test_count = user_tasks.filter(Task.status == TaskStatus.IN_TEST).count()
-    closed_count = user_tasks.filter(Task.status == TaskStatus.CLOSED).count()
-    
-    total_tasks = todo_count + in_progress_count + review_count + ready_to_test_count + in_test_count + closed_count
-    
-    return {
-        "user_id": current_user.id,
-        "username": current_user.username,
-        "total_tasks": total_tasks,
-        "todo": todo_count,
-        "in_progress": in_progress_count,
-        "review": review_count,
-        "ready_to_test": ready_to_test_count,
-        "in_test": in_test_count,
-        "closed": closed_count
-    }
-
 # Time logging endpoints
 @router.post("/{task_id}/time-logs", response_model=TimeLogSchema)
 def create_time_log(
@@ -342,8 +664,9 @@ def create_time_log(
     )
     db.add(db_time_log)
     
-    # Update task's actual hours
-    task.actual_hours += time_log.hours
+    # Update task's actual hours and timesheets atomically
+    apply_time_log_change(db, task, None, snapshot_time_log(db_time_log, task.project_id))
+    record_change(db, "time_log", db_time_log.id, "created", task.project_id, time_log_payload(db_time_log))
     
     db.commit()
     db.refresh(db_time_log)
@@ -408,6 +731,8 @@ def create_task_comment(
         task_id=task_id
     )
     db.add(db_comment)
+    db.flush()
+    record_change(db, "comment", db_comment.id, "created", task.project_id, comment_payload(db_comment))
     db.commit()
     db.refresh(db_comment)
     
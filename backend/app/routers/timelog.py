@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime, date
 from typing import List
 from ..database import get_db
-from ..models import TimeLog, Task, Project, User
+from ..models import TimeLog, Task, Project, User, TimesheetWeek, TimesheetMonth
 from ..schemas.timelog import TimeLogCreate, TimeLogUpdate, TimeLog as TimeLogSchema, TimeLogWithTask
 from ..auth import get_current_user
+from ..time_tracking import apply_time_log_change, logged_between
+from ..timesheets import snapshot_time_log, weeks_between, months_between
+from ..pagination import paginate, set_next_cursor
+from ..export import export_response
+from ..changes import record_change, time_log_payload
 
 router = APIRouter(prefix="/timelog", tags=["time tracking"])
 
@@ -41,38 +46,46 @@ def create_time_log(
         date=time_log.date
     )
     db.add(db_time_log)
-    db.commit()
-    db.refresh(db_time_log)
     
-    # Update task actual hours
-    task.actual_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.task_id == task.id
-    ).scalar() or 0
+    # Update task hours and timesheets in the same transaction
+    apply_time_log_change(db, task, None, snapshot_time_log(db_time_log, task.project_id))
+    record_change(db, "time_log", db_time_log.id, "created", task.project_id, time_log_payload(db_time_log))
     db.commit()
+    db.refresh(db_time_log)
     
     return db_time_log
 
 @router.get("/", response_model=List[TimeLogWithTask])
 def get_time_logs(
+    response: Response,
     task_id: int = None,
     user_id: int = None,
     start_date: date = None,
     end_date: date = None,
+    limit: int = None,
+    cursor: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get time logs with optional filtering."""
-    query = db.query(TimeLog).join(Task).join(Project)
+    # Select only the columns the response needs, in a single query
+    query = db.query(
+        TimeLog.id,
+        TimeLog.hours,
+        TimeLog.description,
+        TimeLog.date,
+        TimeLog.task_id,
+        Task.title.label("task_title"),
+        Project.title.label("project_title"),
+        TimeLog.created_at
+    ).join(Task, TimeLog.task_id == Task.id).join(Project, Task.project_id == Project.id)
     
     # Apply filters
     if task_id:
         query = query.filter(TimeLog.task_id == task_id)
     if user_id:
         query = query.filter(TimeLog.user_id == user_id)
-    if start_date:
-        query = query.filter(func.date(TimeLog.date) >= start_date)
-    if end_date:
-        query = query.filter(func.date(TimeLog.date) <= end_date)
+    query = query.filter(*logged_between(start_date, end_date))
     
     # If not admin, only show user's own logs or logs for tasks they're assigned to
     if not current_user.is_active:  # Assuming admin check
@@ -81,23 +94,51 @@ def get_time_logs(
             (Task.assignee_id == current_user.id)
         )
     
-    time_logs = query.all()
-    
-    # Convert to response format with task and project info
-    result = []
-    for log in time_logs:
-        result.append(TimeLogWithTask(
-            id=log.id,
-            hours=log.hours,
-            description=log.description,
-            date=log.date,
-            task_id=log.task_id,
-            task_title=log.task.title,
-            project_title=log.task.project.title,
-            created_at=log.created_at
-        ))
-    
-    return result
+    time_logs, next_cursor = paginate(query, [TimeLog.date, TimeLog.id], cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
+    
+    return [TimeLogWithTask(**row._mapping) for row in time_logs]
+
+@router.get("/export")
+def export_time_logs(
+    format: str = "csv",
+    task_id: int = None,
+    user_id: int = None,
+    start_date: date = None,
+    end_date: date = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream time logs as CSV or NDJSON, for payroll and billing."""
+    statement = select(
+        TimeLog.id,
+        TimeLog.date,
+        TimeLog.hours,
+        TimeLog.description,
+        TimeLog.user_id,
+        User.username,
+        TimeLog.task_id,
+        Task.title.label("task_title"),
+        Task.project_id,
+        Project.title.label("project_title"),
+        TimeLog.created_at
+    ).join(Task, TimeLog.task_id == Task.id).join(Project, Task.project_id == Project.id).join(
+        User, TimeLog.user_id == User.id
+    )
+    
+    if task_id:
+        statement = statement.where(TimeLog.task_id == task_id)
+    if user_id:
+        statement = statement.where(TimeLog.user_id == user_id)
+    statement = statement.where(*logged_between(start_date, end_date))
+    
+    # Same visibility rule as the time log listing
+    if not current_user.is_active:
+        statement = statement.where(
+            (TimeLog.user_id == current_user.id) |
+            (Task.assignee_id == current_user.id)
+        )
+    
+    return export_response(statement.order_by(TimeLog.date, TimeLog.id), format, "time_logs")
 
 @router.get("/{time_log_id}", response_model=TimeLogSchema)
 def get_time_log(
@@ -148,20 +189,18 @@ def update_time_log(
         )
     
     # Update fields
+    task = db.query(Task).filter(Task.id == time_log.task_id).first()
+    before = snapshot_time_log(time_log, task.project_id)
     update_data = time_log_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(time_log, field, value)
     
+    # Update task hours and timesheets in the same transaction
+    apply_time_log_change(db, task, before, snapshot_time_log(time_log, task.project_id))
+    record_change(db, "time_log", time_log.id, "updated", task.project_id, time_log_payload(time_log))
     db.commit()
     db.refresh(time_log)
     
-    # Update task actual hours
-    task = db.query(Task).filter(Task.id == time_log.task_id).first()
-    task.actual_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.task_id == task.id
-    ).scalar() or 0
-    db.commit()
-    
     return time_log
 
 @router.delete("/{time_log_id}")
@@ -185,15 +224,12 @@ def delete_time_log(
             detail="Not authorized to delete this time log"
         )
     
-    task_id = time_log.task_id
+    task = db.query(Task).filter(Task.id == time_log.task_id).first()
     db.delete(time_log)
-    db.commit()
     
-    # Update task actual hours
-    task = db.query(Task).filter(Task.id == task_id).first()
-    task.actual_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.task_id == task.id
-    ).scalar() or 0
+    # Update task hours and timesheets in the same transaction
+    apply_time_log_change(db, task, snapshot_time_log(time_log, task.project_id), None)
+    record_change(db, "time_log", time_log_id, "deleted", task.project_id)
     db.commit()
     
     return {"message": "Time log deleted successfully"}
@@ -213,36 +249,197 @@ def get_user_time_summary(
         # For now, allow if user_id matches current_user
         pass
     
-    query = db.query(TimeLog).filter(TimeLog.user_id == user_id)
-    
-    if start_date:
-        query = query.filter(func.date(TimeLog.date) >= start_date)
-    if end_date:
-        query = query.filter(func.date(TimeLog.date) <= end_date)
+    if start_date or end_date:
+        # Arbitrary ranges don't line up with the rollups, read the raw logs
+        query = db.query(
+            TimeLog.task_id,
+            Task.title.label("task_title"),
+            Project.title.label("project_title"),
+            func.sum(TimeLog.hours).label("total_hours")
+        ).join(Task, TimeLog.task_id == Task.id).join(Project, Task.project_id == Project.id).filter(
+            TimeLog.user_id == user_id
+        ).filter(*logged_between(start_date, end_date))
+        group_by = [TimeLog.task_id, Task.title, Project.title]
+    else:
+        query = db.query(
+            TimesheetWeek.task_id,
+            Task.title.label("task_title"),
+            Project.title.label("project_title"),
+            func.sum(TimesheetWeek.hours).label("total_hours")
+        ).join(Task, TimesheetWeek.task_id == Task.id).join(Project, Task.project_id == Project.id).filter(
+            TimesheetWeek.user_id == user_id
+        )
+        group_by = [TimesheetWeek.task_id, Task.title, Project.title]
     
-    total_hours = db.query(func.sum(TimeLog.hours)).filter(
-        TimeLog.user_id == user_id
+    total_hours = db.query(func.sum(TimesheetMonth.hours)).filter(
+        TimesheetMonth.user_id == user_id
     ).scalar() or 0
     
-    time_logs = query.all()
-    
-    # Group by task
-    task_summary = {}
-    for log in time_logs:
-        if log.task_id not in task_summary:
-            task_summary[log.task_id] = {
-                "task_title": log.task.title,
-                "project_title": log.task.project.title,
-                "total_hours": 0
-            }
-        task_summary[log.task_id]["total_hours"] += log.hours
+    # Group by task in the database
+    task_summary = [
+        {
+            "task_title": row.task_title,
+            "project_title": row.project_title,
+            "total_hours": row.total_hours
+        }
+        for row in query.group_by(*group_by).order_by(group_by[0])
+    ]
     
     return {
         "user_id": user_id,
         "total_hours": total_hours,
-        "task_summary": list(task_summary.values()),
+        "task_summary": task_summary,
         "period": {
             "start_date": start_date,
             "end_date": end_date
         }
-    } 
\ No newline at end of file
+    }
+
+def _period(start_date: date, end_date: date) -> dict:
+    return {"start_date": start_date, "end_date": end_date}
+
+@router.get("/summary/user/{user_id}/weekly")
+def get_user_weekly_timesheet(
+    user_id: int,
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a user's hours per ISO week and project, from the weekly rollup."""
+    rows = db.query(
+        TimesheetWeek.iso_year,
+        TimesheetWeek.iso_week,
+        TimesheetWeek.project_id,
+        Project.title.label("project_title"),
+        func.sum(TimesheetWeek.hours).label("total_hours")
+    ).join(Project, TimesheetWeek.project_id == Project.id).filter(
+        TimesheetWeek.user_id == user_id,
+        *weeks_between(start_date, end_date)
+    ).group_by(
+        TimesheetWeek.iso_year, TimesheetWeek.iso_week, TimesheetWeek.project_id, Project.title
+    ).order_by(TimesheetWeek.iso_year, TimesheetWeek.iso_week, TimesheetWeek.project_id)
+    
+    return {
+        "user_id": user_id,
+        "weeks": [
+            {
+                "iso_year": row.iso_year,
+                "iso_week": row.iso_week,
+                "week_start": date.fromisocalendar(row.iso_year, row.iso_week, 1),
+                "project_id": row.project_id,
+                "project_title": row.project_title,
+                "total_hours": row.total_hours
+            }
+            for row in rows
+        ],
+        "period": _period(start_date, end_date)
+    }
+
+@router.get("/summary/user/{user_id}/monthly")
+def get_user_monthly_timesheet(
+    user_id: int,
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a user's hours per month and project, from the monthly rollup."""
+    rows = db.query(
+        TimesheetMonth.year,
+        TimesheetMonth.month,
+        TimesheetMonth.project_id,
+        Project.title.label("project_title"),
+        TimesheetMonth.hours
+    ).join(Project, TimesheetMonth.project_id == Project.id).filter(
+        TimesheetMonth.user_id == user_id,
+        *months_between(start_date, end_date)
+    ).order_by(TimesheetMonth.year, TimesheetMonth.month, TimesheetMonth.project_id)
+    
+    return {
+        "user_id": user_id,
+        "months": [
+            {
+                "year": row.year,
+                "month": row.month,
+                "project_id": row.project_id,
+                "project_title": row.project_title,
+                "total_hours": row.hours
+            }
+            for row in rows
+        ],
+        "period": _period(start_date, end_date)
+    }
+
+@router.get("/summary/project/{project_id}/weekly")
+def get_project_weekly_timesheet(
+    project_id: int,
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a project's hours per ISO week and user, from the weekly rollup."""
+    rows = db.query(
+        TimesheetWeek.iso_year,
+        TimesheetWeek.iso_week,
+        TimesheetWeek.user_id,
+        User.username,
+        func.sum(TimesheetWeek.hours).label("total_hours")
+    ).join(User, TimesheetWeek.user_id == User.id).filter(
+        TimesheetWeek.project_id == project_id,
+        *weeks_between(start_date, end_date)
+    ).group_by(
+        TimesheetWeek.iso_year, TimesheetWeek.iso_week, TimesheetWeek.user_id, User.username
+    ).order_by(TimesheetWeek.iso_year, TimesheetWeek.iso_week, TimesheetWeek.user_id)
+    
+    return {
+        "project_id": project_id,
+        "weeks": [
+            {
+                "iso_year": row.iso_year,
+                "iso_week": row.iso_week,
+                "week_start": date.fromisocalendar(row.iso_year, row.iso_week, 1),
+                "user_id": row.user_id,
+                "username": row.username,
+                "total_hours": row.total_hours
+            }
+            for row in rows
+        ],
+        "period": _period(start_date, end_date)
+    }
+
+@router.get("/summary/project/{project_id}/monthly")
+def get_project_monthly_timesheet(
+    project_id: int,
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a project's hours per month and user, from the monthly rollup."""
+    rows = db.query(
+        TimesheetMonth.year,
+        TimesheetMonth.month,
+        TimesheetMonth.user_id,
+        User.username,
+        TimesheetMonth.hours
+    ).join(User, TimesheetMonth.user_id == User.id).filter(
+        TimesheetMonth.project_id == project_id,
+        *months_between(start_date, end_date)
+    ).order_by(TimesheetMonth.year, TimesheetMonth.month, TimesheetMonth.user_id)
+    
+    return {
+        "project_id": project_id,
+        "months": [
+            {
+                "year": row.year,
+                "month": row.month,
+                "user_id": row.user_id,
+                "username": row.username,
+                "total_hours": row.hours
+            }
+            for row in rows
+        ],
+        "period": _period(start_date, end_date)
+    }
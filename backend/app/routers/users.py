@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Security
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import User
 from ..schemas.user import User as UserSchema, UserUpdate
-from ..auth import get_current_active_user, get_password_hash
+from ..auth import get_current_active_user, get_password_hash, invalidate_principal
+from ..pagination import paginate, set_next_cursor
+from ..user_suggest import suggest_users, invalidate_suggestions, MAX_SUGGESTIONS
 
 security = HTTPBearer()
 
@@ -22,6 +24,7 @@ def update_current_user(
     db: Session = Depends(get_db)
 ):
     """Update current user information."""
+    db_user = db.query(User).filter(User.id == current_user.id).first()
     update_data = user_update.dict(exclude_unset=True)
     
     # Hash password if provided
@@ -29,19 +32,38 @@ def update_current_user(
         update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
     
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(db_user, field, value)
     
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    db.refresh(db_user)
+    invalidate_principal(current_user.username)
+    invalidate_principal(db_user.username)
+    invalidate_suggestions()
+    return db_user
+
+@router.get("/suggest", response_model=list[UserSchema])
+def suggest(
+    q: str,
+    limit: int = 10,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Suggest users whose username, full name or email starts with ``q``."""
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SUGGESTIONS}")
+    return suggest_users(db, q, limit)
 
 @router.get("/", response_model=list[UserSchema])
 def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get all users (for project assignment purposes)."""
-    users = db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+    query = db.query(User).filter(User.is_active == True)
+    users, next_cursor = paginate(query, [User.username, User.id], cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
     return users 
\ No newline at end of file
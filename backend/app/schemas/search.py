@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class SearchResult(BaseModel):
+    entity: str
+    id: int
+    project_id: Optional[int] = None
+    title: Optional[str] = None
+    snippet: str
+    rank: float
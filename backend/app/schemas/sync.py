@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List
+from .project import Project
+from .task import Task, Comment
+from .timelog import TimeLog
+
+class SyncChanges(BaseModel):
+    projects: List[Project] = []
+    tasks: List[Task] = []
+    comments: List[Comment] = []
+    time_logs: List[TimeLog] = []
+
+class SyncDeleted(BaseModel):
+    projects: List[int] = []
+    tasks: List[int] = []
+    comments: List[int] = []
+    time_logs: List[int] = []
+
+class SyncResponse(BaseModel):
+    token: str
+    has_more: bool = False
+    reset: bool = False
+    changes: SyncChanges = SyncChanges()
+    deleted: SyncDeleted = SyncDeleted()
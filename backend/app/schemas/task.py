@@ -45,6 +45,38 @@ class Task(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+class TaskBulkDelete(BaseModel):
+    ids: List[int]
+
+class TaskBulkResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status_code: int
+    detail: Optional[str] = None
+    task: Optional[Task] = None
+
+class TaskCard(BaseModel):
+    id: int
+    title: str
+    priority: Optional[TaskPriority] = None
+    assignee_name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class BoardColumn(BaseModel):
+    status: TaskStatus
+    total: int
+    tasks: List[TaskCard]
+    next_cursor: Optional[str] = None
+
+class Board(BaseModel):
+    project_id: int
+    columns: List[BoardColumn]
+
 class TimeLogBase(BaseModel):
     hours: int
     description: Optional[str] = None
@@ -13,7 +13,8 @@ class TimeLogCreate(TimeLogBase):
 class TimeLogUpdate(BaseModel):
     hours: Optional[int] = None
     description: Optional[str] = None
-    date: Optional[datetime] = None
+    # May be omitted, but not cleared
+    date: datetime = None
 
 class TimeLog(TimeLogBase):
     id: int
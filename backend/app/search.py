@@ -0,0 +1,233 @@
+"""
+Full-text search over tasks, projects and comments.
+
+Task and project titles and descriptions and comment contents are indexed
+with the database's own full-text engine:
+
+* Postgres: GIN expression indexes over a weighted ``tsvector`` of each
+  table (titles rank above bodies), searched with ``@@`` and ranked with
+  ``ts_rank_cd``. The index is maintained by Postgres itself.
+* SQLite: an FTS5 table, ``search_index``, kept in sync by triggers on the
+  source tables and ranked with ``bm25``. Each row's rowid encodes the
+  source row, ``id * 4 + kind``, so the triggers update it by key.
+
+Because both are maintained inside the database, every write path stays in
+sync, including bulk and Core statements. ``create_search_index`` is
+applied by ``app.migrations`` and backfills a newly created index.
+"""
+
+import html
+import re
+from typing import List, Optional, Sequence
+from sqlalchemy import String, cast, func, literal, literal_column, null, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from .models import Task, Project, Comment
+
+SEARCH_KINDS = ("task", "project", "comment")
+MAX_SEARCH_RESULTS = 100
+SNIPPET_START, SNIPPET_END = "<mark>", "</mark>"
+# Placeholders the database wraps matches in; swapped for SNIPPET_START and
+# SNIPPET_END once the snippet text has been HTML-escaped
+HIGHLIGHT_START, HIGHLIGHT_END = "\x02", "\x03"
+SEARCH_DIALECTS = ("postgresql", "sqlite")
+# Text search configuration (stemming and stop words) used on Postgres
+TEXT_SEARCH_CONFIG = literal_column("'english'")
+BLANK = literal_column("''")
+
+# Kind -> (model, title column, body column, project id expression)
+SOURCES = {
+    "task": (Task, Task.title, Task.description, Task.project_id),
+    "project": (Project, Project.title, Project.description, Project.id),
+    "comment": (Comment, None, Comment.content, func.coalesce(Comment.project_id, Task.project_id))
+}
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a free-text query; anything else is dropped, so no input is a syntax error."""
+    return re.findall(r"\w+", query.lower())
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet, then mark its matches with ``<mark>``."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(HIGHLIGHT_START, SNIPPET_START).replace(HIGHLIGHT_END, SNIPPET_END)
+
+
+# Postgres
+
+def _document(title, body):
+    """Weighted tsvector of a row; also the indexed expression, so both must match."""
+    body_vector = func.setweight(func.to_tsvector(TEXT_SEARCH_CONFIG, func.coalesce(body, BLANK)), literal_column("'B'"))
+    if title is None:
+        return body_vector
+    title_vector = func.setweight(func.to_tsvector(TEXT_SEARCH_CONFIG, func.coalesce(title, BLANK)), literal_column("'A'"))
+    return title_vector.op("||")(body_vector)
+
+
+def _create_postgres_indexes(connection: Connection):
+    for kind, (model, title, body, _) in SOURCES.items():
+        document = _document(title, body).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        # Index expressions take bare column names
+        document = str(document).replace(f"{model.__tablename__}.", "")
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{model.__tablename__}_search ON {model.__tablename__} USING gin (({document}))"
+        ))
+
+
+def _search_postgres(db: Session, terms: List[str], kinds: Sequence[str], project_id: Optional[int], limit: int) -> list:
+    # Every term must match; the last one may be a prefix, for search-as-you-type
+    query = func.to_tsquery(TEXT_SEARCH_CONFIG, " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+    matches = []
+    for kind in kinds:
+        model, title, body, project = SOURCES[kind]
+        document = _document(title, body)
+        statement = select(
+            literal(kind).label("entity"),
+            model.id.label("id"),
+            project.label("project_id"),
+            (title if title is not None else cast(null(), String)).label("title"),
+            body.label("body"),
+            func.ts_rank_cd(document, query).label("rank")
+        ).where(document.op("@@")(query))
+        if kind == "comment":
+            statement = statement.outerjoin(Task, Comment.task_id == Task.id)
+        if project_id is not None:
+            statement = statement.where(project == project_id)
+        matches.append(statement)
+
+    # Headlines are costly, so they are only built for the page of top matches
+    top = union_all(*matches).order_by(literal_column("rank").desc()).limit(limit).subquery()
+    headline = func.ts_headline(
+        TEXT_SEARCH_CONFIG,
+        func.concat_ws(" ", top.c.title, top.c.body),
+        query,
+        f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=24, MinWords=8"
+    )
+    rows = db.execute(
+        select(top.c.entity, top.c.id, top.c.project_id, top.c.title, headline.label("snippet"), top.c.rank)
+        .order_by(top.c.rank.desc())
+    ).mappings().all()
+    return [{**row, "snippet": highlight(row["snippet"])} for row in rows]
+
+
+# SQLite
+
+SQLITE_KIND_CODES = {kind: code for code, kind in enumerate(SEARCH_KINDS)}
+SQLITE_TRIGGER_SOURCES = {
+    "task": ("tasks", "new.project_id", "new.title", "new.description", "title, description, project_id"),
+    "project": ("projects", "new.id", "new.title", "new.description", "title, description"),
+    "comment": (
+        "comments",
+        "coalesce(new.project_id, (SELECT project_id FROM tasks WHERE id = new.task_id))",
+        "NULL",
+        "new.content",
+        "content, project_id, task_id"
+    )
+}
+# Comments on a task take its project, so they follow it when it moves
+SQLITE_TRIGGER_EXTRAS = {
+    "task": (
+        "UPDATE search_index SET project_id = new.project_id "
+        "WHERE rowid IN (SELECT id * 4 + 2 FROM comments WHERE task_id = new.id AND project_id IS NULL); "
+    )
+}
+
+
+def _create_sqlite_index(connection: Connection):
+    created = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    )).first() is None
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index "
+        "USING fts5(project_id UNINDEXED, title, body, tokenize = 'porter unicode61')"
+    ))
+    for kind, (table, project, title, body, watched) in SQLITE_TRIGGER_SOURCES.items():
+        rowid = f"{{row}}.id * 4 + {SQLITE_KIND_CODES[kind]}"
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO search_index (rowid, project_id, title, body) VALUES ({rowid.format(row='new')}, {project}, {title}, {body}); "
+            "END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {watched} ON {table} BEGIN "
+            f"UPDATE search_index SET project_id = {project}, title = {title}, body = {body} WHERE rowid = {rowid.format(row='new')}; "
+            f"{SQLITE_TRIGGER_EXTRAS.get(kind, '')}END"
+        ))
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = {rowid.format(row='old')}; "
+            "END"
+        ))
+        if created:
+            source = project.replace("new.", f"{table}.")
+            connection.execute(text(
+                f"INSERT INTO search_index (rowid, project_id, title, body) "
+                f"SELECT {rowid.format(row=table)}, {source}, {title.replace('new.', '')}, {body.replace('new.', '')} FROM {table}"
+            ))
+
+
+def _search_sqlite(db: Session, terms: List[str], kinds: Sequence[str], project_id: Optional[int], limit: int) -> list:
+    # Quoted terms are literal tokens; the last one may be a prefix
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    conditions = [f"rowid % 4 IN ({', '.join(str(SQLITE_KIND_CODES[kind]) for kind in kinds)})"]
+    if project_id is not None:
+        conditions.append("project_id = :project_id")
+    rows = db.execute(text(
+        "SELECT rowid, project_id, title, "
+        "snippet(search_index, -1, :highlight_start, :highlight_end, '…', 16) AS snippet, "
+        # bm25 is lower for better matches; titles weigh ten times as much as bodies
+        "-bm25(search_index, 0.0, 10.0, 1.0) AS rank "
+        f"FROM search_index WHERE search_index MATCH :match AND {' AND '.join(conditions)} "
+        "ORDER BY rank DESC LIMIT :limit"
+    ), {
+        "match": match,
+        "project_id": project_id,
+        "limit": limit,
+        "highlight_start": HIGHLIGHT_START,
+        "highlight_end": HIGHLIGHT_END
+    }).mappings().all()
+    return [
+        {
+            "entity": SEARCH_KINDS[row["rowid"] % 4],
+            "id": row["rowid"] // 4,
+            "project_id": int(row["project_id"]) if row["project_id"] is not None else None,
+            "title": row["title"],
+            "snippet": highlight(row["snippet"]),
+            "rank": row["rank"]
+        }
+        for row in rows
+    ]
+
+
+def create_search_index(connection: Connection):
+    """Create the full-text index for the connection's database, if supported."""
+    if connection.dialect.name == "postgresql":
+        _create_postgres_indexes(connection)
+    elif connection.dialect.name == "sqlite":
+        _create_sqlite_index(connection)
+
+
+def search_available(db: Session) -> bool:
+    """Whether the session's database has a full-text engine ``search`` supports."""
+    return db.get_bind().dialect.name in SEARCH_DIALECTS
+
+
+def search(
+    db: Session,
+    query: str,
+    kinds: Sequence[str] = SEARCH_KINDS,
+    project_id: Optional[int] = None,
+    limit: int = 20
+) -> list:
+    """Best matches for ``query``, each with an HTML-escaped, highlighted snippet."""
+    terms = search_terms(query)
+    if not terms or not kinds:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _search_postgres(db, terms, kinds, project_id, limit)
+    if dialect == "sqlite":
+        return _search_sqlite(db, terms, kinds, project_id, limit)
+    raise NotImplementedError(f"Full-text search is not available on {dialect}")
@@ -12,6 +12,8 @@ from sqlalchemy import create_engine
 from app.database import get_db
 from app.models import User, Project, Task, TimeLog, Comment, TaskStatus, TaskPriority
 from app.auth import get_password_hash
+from app.project_stats import rebuild_project_stats
+from app.timesheets import rebuild_timesheets
 from app.schemas.user import UserCreate
 from app.schemas.project import ProjectCreate
 from app.schemas.task import TaskCreate
@@ -368,8 +370,19 @@ def create_sample_time_logs(db: Session, tasks: list, users: list):
     print(f"Created {len(created_logs)} time logs")
     return created_logs
 
+# Arbitrary application-wide key serializing concurrent seeding runs
+SEED_LOCK_KEY = 8_140_003
+
 def main():
     """Main function to seed the database."""
+    from app.database import engine, advisory_lock
+    
+    # Workers that start together seed one at a time; the rest find the data in place
+    with advisory_lock(engine, SEED_LOCK_KEY):
+        seed()
+
+def seed():
+    """Create the sample data unless the database already has users."""
     print("Starting database seeding...")
     
     # Import database session
@@ -377,11 +390,18 @@ def main():
     
     db = SessionLocal()
     try:
+        if db.query(User.id).first() is not None:
+            print("Database already has users, skipping seeding.")
+            return
+        
         # Create sample data
         users = create_sample_users(db)
         projects = create_sample_projects(db, users)
         tasks = create_sample_tasks(db, projects, users)
         time_logs = create_sample_time_logs(db, tasks, users)
+        rebuild_project_stats(db)
+        rebuild_timesheets(db)
+        db.commit()
         
         print("\n✅ Database seeding completed successfully!")
         print(f"📊 Created:")
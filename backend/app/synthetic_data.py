@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for load testing.
+
+Bulk-inserts configurable volumes of users, projects, tasks, time logs and
+comments, in batches of multi-row INSERTs (``COPY`` on Postgres). The
+derived tables are written in the same pass instead of being rebuilt
+afterwards:
+- ``tasks.actual_hours`` is the sum of each task's generated logs;
+- ``project_stats`` rows are written for the new projects;
+- ``timesheet_weeks`` and ``timesheet_months`` are upserted batch by batch.
+Every batch commits on its own, so memory stays flat at any volume and an
+interrupted run keeps what it wrote. Output is deterministic for a given
+``--seed``, and new rows are appended after the existing ids. Every
+generated user's password is ``password123``.
+
+Usage (from the backend directory):
+    python -m app.synthetic_data --users 10000 --projects 50000 --tasks 5000000 --time-logs 50000000
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from .auth import get_password_hash
+from .models import User, Project, Task, TimeLog, Comment, ProjectStats, TimesheetWeek, TimesheetMonth, TaskStatus, TaskPriority
+from .project_stats import STATUS_FIELDS, STATS_FIELDS
+from .timesheets import UPSERT_DIALECTS
+
+DEFAULT_BATCH_SIZE = 10000
+SYNTHETIC_PASSWORD = "password123"
+# Generated history reaches this many days back
+HISTORY_DAYS = 365
+
+STATUS_WEIGHTS = {
+    TaskStatus.TODO: 30,
+    TaskStatus.IN_PROGRESS: 20,
+    TaskStatus.REVIEW: 10,
+    TaskStatus.READY_TO_TEST: 5,
+    TaskStatus.IN_TEST: 5,
+    TaskStatus.CLOSED: 30
+}
+WORDS = (
+    "api billing cache checkout dashboard database deploy email export invoice login "
+    "mobile onboarding payment permissions report search session signup sync upload "
+    "analytics audit backup calendar chart config feed filter import metrics "
+    "notification profile queue schema settings storage timeline webhook widget"
+).split()
+VERBS = ("Fix", "Add", "Refactor", "Test", "Document", "Optimize", "Review", "Migrate", "Design", "Remove")
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (TaskStatus, TaskPriority)):
+        # Enum columns store member names
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_rows(connection: Connection, table, columns: Sequence[str], rows: List[tuple]):
+    """Insert rows given as tuples in ``columns`` order; uses COPY on Postgres."""
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # An unquoted empty field is NULL in COPY's csv format
+            writer.writerow(["" if value is None else value for value in map(_copy_value, row)])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        connection.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+def _upsert_hours(connection: Connection, table, rows: List[dict]):
+    if not rows:
+        return
+    statement = UPSERT_DIALECTS[connection.dialect.name](table)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={"hours": table.c.hours + statement.excluded.hours}
+    ), rows)
+
+
+def _next_id(connection: Connection, model) -> int:
+    return connection.execute(select(func.coalesce(func.max(model.id), 0))).scalar() + 1
+
+
+def _sync_sequences(connection: Connection, models):
+    # Rows were inserted with explicit ids, so move the serial sequences past them
+    for model in models:
+        table = model.__tablename__
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        ))
+
+
+def generate(
+    engine: Engine,
+    users: int,
+    projects: int,
+    tasks: int,
+    time_logs: int,
+    comments: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: int = 0
+) -> Dict[str, int]:
+    """Append synthetic data and its derived rows; returns the rows written per table."""
+    if engine.dialect.name not in UPSERT_DIALECTS:
+        raise ValueError(f"Unsupported database: {engine.dialect.name}")
+    if users < 1 or (tasks and projects < 1) or (time_logs and tasks < 1) or (comments and tasks < 1):
+        raise ValueError("Tasks need projects, and time logs and comments need tasks")
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    priorities = list(TaskPriority)
+    written = defaultdict(int)
+
+    with engine.begin() as connection:
+        first_user, first_project, first_task, first_time_log, first_comment = (
+            _next_id(connection, model) for model in (User, Project, Task, TimeLog, Comment)
+        )
+    hashed_password = get_password_hash(SYNTHETIC_PASSWORD)
+
+    def random_user() -> int:
+        return first_user + rng.randrange(users)
+
+    def random_moment(since: datetime) -> datetime:
+        return since + timedelta(seconds=rng.randrange(max(int((now - since).total_seconds()), 1)))
+
+    start_of_history = now - timedelta(days=HISTORY_DAYS)
+
+    user_columns = ("id", "username", "email", "full_name", "hashed_password", "is_active", "created_at")
+    for start in range(0, users, batch_size):
+        rows = []
+        for user_id in range(first_user + start, first_user + min(start + batch_size, users)):
+            rows.append((
+                user_id, f"synth{user_id}", f"synth{user_id}@example.com", f"Synthetic User {user_id}",
+                hashed_password, True, random_moment(start_of_history)
+            ))
+        with engine.begin() as connection:
+            write_rows(connection, User.__table__, user_columns, rows)
+        written["users"] += len(rows)
+
+    project_columns = ("id", "title", "description", "status", "start_date", "end_date", "owner_id", "created_at")
+    for start in range(0, projects, batch_size):
+        rows = []
+        for project_id in range(first_project + start, first_project + min(start + batch_size, projects)):
+            created_at = random_moment(start_of_history)
+            rows.append((
+                project_id, f"{_words(rng, 2).title()} {project_id}", _words(rng, 12), "active",
+                created_at, created_at + timedelta(days=rng.randint(30, 2 * HISTORY_DAYS)), random_user(), created_at
+            ))
+        with engine.begin() as connection:
+            write_rows(connection, Project.__table__, project_columns, rows)
+        written["projects"] += len(rows)
+
+    # Tasks and their time logs are written together, so each task's
+    # actual_hours and the rollups are known without re-reading anything
+    stats = {project_id: dict.fromkeys(STATS_FIELDS, 0) for project_id in range(first_project, first_project + projects)}
+    task_columns = (
+        "id", "title", "description", "status", "priority", "estimated_hours", "actual_hours",
+        "project_id", "assignee_id", "created_at"
+    )
+    time_log_columns = ("id", "task_id", "user_id", "hours", "description", "date")
+    week_columns = ("user_id", "iso_year", "iso_week", "task_id", "project_id", "hours")
+    time_log_id = first_time_log
+    for start in range(0, tasks, batch_size):
+        task_rows, time_log_rows = [], []
+        weekly, monthly = defaultdict(int), defaultdict(int)
+        for index in range(start, min(start + batch_size, tasks)):
+            task_id = first_task + index
+            project_id = first_project + rng.randrange(projects)
+            assignee_id = random_user()
+            task_status = rng.choices(statuses, weights)[0]
+            estimated_hours = rng.randint(1, 40)
+            created_at = random_moment(start_of_history)
+
+            # Spread the logs evenly so the requested total is exact
+            actual_hours = 0
+            for _ in range(time_logs * (index + 1) // tasks - time_logs * index // tasks):
+                user_id = assignee_id if rng.random() < 0.8 else random_user()
+                hours = rng.randint(1, 8)
+                logged_at = random_moment(created_at)
+                time_log_rows.append((time_log_id, task_id, user_id, hours, _words(rng, 6), logged_at))
+                time_log_id += 1
+                actual_hours += hours
+                iso_year, iso_week, _ = logged_at.isocalendar()
+                weekly[(user_id, iso_year, iso_week, task_id, project_id)] += hours
+                monthly[(user_id, logged_at.year, logged_at.month, project_id)] += hours
+
+            task_rows.append((
+                task_id, f"{rng.choice(VERBS)} {_words(rng, 3)}", _words(rng, 25), task_status,
+                rng.choice(priorities), estimated_hours, actual_hours, project_id, assignee_id, created_at
+            ))
+            project_stats = stats[project_id]
+            project_stats["total_tasks"] += 1
+            project_stats[STATUS_FIELDS[task_status]] += 1
+            project_stats["total_estimated_hours"] += estimated_hours
+            project_stats["total_actual_hours"] += actual_hours
+
+        with engine.begin() as connection:
+            write_rows(connection, Task.__table__, task_columns, task_rows)
+            write_rows(connection, TimeLog.__table__, time_log_columns, time_log_rows)
+            # Weekly rows are keyed by task, so every batch writes fresh ones
+            write_rows(connection, TimesheetWeek.__table__, week_columns, [(*key, hours) for key, hours in weekly.items()])
+            _upsert_hours(connection, TimesheetMonth.__table__, [
+                {"user_id": user_id, "year": year, "month": month, "project_id": project_id, "hours": hours}
+                for (user_id, year, month, project_id), hours in monthly.items()
+            ])
+        written["tasks"] += len(task_rows)
+        written["time_logs"] += len(time_log_rows)
+        written["timesheet_weeks"] += len(weekly)
+
+    comment_columns = ("id", "content", "user_id", "task_id", "created_at")
+    for start in range(0, comments, batch_size):
+        rows = []
+        for comment_id in range(first_comment + start, first_comment + min(start + batch_size, comments)):
+            rows.append((
+                comment_id, _words(rng, rng.randint(5, 30)).capitalize() + ".", random_user(),
+                first_task + rng.randrange(tasks), random_moment(start_of_history)
+            ))
+        with engine.begin() as connection:
+            write_rows(connection, Comment.__table__, comment_columns, rows)
+        written["comments"] += len(rows)
+
+    stats_columns = ("project_id", *STATS_FIELDS)
+    project_ids = list(stats)
+    for start in range(0, len(project_ids), batch_size):
+        rows = [
+            (project_id, *(stats[project_id][field] for field in STATS_FIELDS))
+            for project_id in project_ids[start:start + batch_size]
+        ]
+        with engine.begin() as connection:
+            write_rows(connection, ProjectStats.__table__, stats_columns, rows)
+        written["project_stats"] += len(rows)
+
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            _sync_sequences(connection, (User, Project, Task, TimeLog, Comment))
+        # Refresh planner statistics for the new volumes
+        connection.execute(text("ANALYZE"))
+    return dict(written)
+
+
+def main():
+    from .database import engine
+    from .migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--time-logs", type=int, default=1000000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    start = time.perf_counter()
+    written = generate(
+        engine, args.users, args.projects, args.tasks, args.time_logs, args.comments,
+        batch_size=args.batch_size, seed=args.seed
+    )
+    elapsed = time.perf_counter() - start
+    for table, count in written.items():
+        print(f"{table:>16}: {count}")
+    print(f"Generated in {elapsed:.1f}s; every synthetic user's password is {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
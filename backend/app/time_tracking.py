@@ -0,0 +1,133 @@
+"""
+Logged-hours bookkeeping shared by the task and time-log routers.
+
+Every time-log write goes through ``apply_time_log_change``, which adjusts
+``Task.actual_hours`` with a single atomic
+``UPDATE ... SET actual_hours = actual_hours + :delta`` in the writer's
+transaction, so concurrent logs never lose updates. The reconciler repairs
+any drift against ``SUM(time_logs.hours)``; it runs periodically in the app
+and on demand with ``python -m app.time_tracking``.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session
+from .models import Task, TimeLog
+from .project_stats import record_actual_hours_change, rebuild_project_stats
+from .timesheets import LoggedTime, record_time_log_change
+
+logger = logging.getLogger(__name__)
+
+ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS = float(os.getenv("ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS", "3600"))
+
+
+def logged_between(start_date: Optional[date] = None, end_date: Optional[date] = None) -> list:
+    """Half-open ``TimeLog.date`` range covering whole days, inclusive of ``end_date``.
+
+    Comparing the bare column (rather than ``date(TimeLog.date)``) lets the
+    database use the ``(user_id, date)`` and ``(task_id, date)`` indexes.
+    """
+    conditions = []
+    if start_date:
+        conditions.append(TimeLog.date >= datetime.combine(start_date, time.min))
+    if end_date:
+        conditions.append(TimeLog.date < datetime.combine(end_date + timedelta(days=1), time.min))
+    return conditions
+
+
+def apply_logged_hours(db: Session, task: Task, delta: int):
+    """Add ``delta`` logged hours to a task and its project stats."""
+    if not delta:
+        return
+    db.execute(
+        update(Task)
+        .where(Task.id == task.id)
+        .values(actual_hours=func.coalesce(Task.actual_hours, 0) + delta)
+        .execution_options(synchronize_session=False)
+    )
+    db.expire(task, ["actual_hours"])
+    record_actual_hours_change(db, task.project_id, delta)
+
+
+def apply_time_log_change(db: Session, task: Task, before: Optional[LoggedTime], after: Optional[LoggedTime]):
+    """Update task hours, project stats and timesheets for one time-log write.
+
+    Pass ``before=None`` for a new log and ``after=None`` for a deleted one.
+    """
+    delta = (after.hours if after else 0) - (before.hours if before else 0)
+    apply_logged_hours(db, task, delta)
+    record_time_log_change(db, before, after)
+
+
+def reconcile_actual_hours(db: Session) -> List[dict]:
+    """Reset ``actual_hours`` to the sum of logged hours where they disagree.
+
+    Only tasks with time logs are considered, so hours entered by hand on
+    tasks without logs are left alone. The check and the write are a single
+    UPDATE, so a time log committed meanwhile is not overwritten by a stale
+    sum. Returns the corrected tasks; the caller is responsible for
+    committing.
+    """
+    logged_hours = select(func.coalesce(func.sum(TimeLog.hours), 0)).where(
+        TimeLog.task_id == Task.id
+    ).scalar_subquery()
+    corrected = db.execute(
+        update(Task)
+        .where(exists().where(TimeLog.task_id == Task.id), func.coalesce(Task.actual_hours, 0) != logged_hours)
+        .values(actual_hours=logged_hours)
+        .returning(Task.id, Task.project_id, Task.actual_hours)
+        .execution_options(synchronize_session=False)
+    ).all()
+    corrections = [
+        {"task_id": task_id, "project_id": project_id, "actual": actual_hours}
+        for task_id, project_id, actual_hours in corrected
+    ]
+
+    project_ids = {correction["project_id"] for correction in corrections if correction["project_id"] is not None}
+    if project_ids:
+        rebuild_project_stats(db, project_ids)
+    return corrections
+
+
+def run_reconciler() -> List[dict]:
+    """Reconcile logged hours in a session of its own."""
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        corrections = reconcile_actual_hours(db)
+        db.commit()
+        return corrections
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def reconcile_periodically(interval: float = ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS):
+    """Run the reconciler every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            corrections = await asyncio.to_thread(run_reconciler)
+            if corrections:
+                logger.warning(f"Repaired actual_hours drift on {len(corrections)} task(s)")
+        except Exception as e:
+            logger.error(f"Actual hours reconciliation failed: {e}")
+
+
+def main():
+    """Reconcile logged hours from the command line."""
+    corrections = run_reconciler()
+    for correction in corrections:
+        print(f"Task {correction['task_id']}: actual_hours set to {correction['actual']}")
+    print(f"Reconciled actual hours, {len(corrections)} task(s) corrected.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Pre-aggregated weekly and monthly timesheets.
+
+``timesheet_weeks`` holds hours per (user, ISO week, task) and
+``timesheet_months`` holds hours per (user, month, project). Every time-log
+write calls ``record_time_log_change`` in its own transaction, and that
+upserts the affected rollup rows with an ``hours = hours + :delta``.
+A task moving to another project takes its hours along
+(``record_task_moves``). ``rebuild_timesheets`` backfills both tables from
+``time_logs``; run it with ``python -m app.timesheets``.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, insert, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from .models import Task, TimeLog, TimesheetWeek, TimesheetMonth
+
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+
+class LoggedTime(NamedTuple):
+    user_id: Optional[int]
+    task_id: Optional[int]
+    project_id: Optional[int]
+    date: Optional[datetime]
+    hours: int
+
+
+def snapshot_time_log(time_log: TimeLog, project_id: Optional[int]) -> LoggedTime:
+    """Capture the time-log fields that contribute to the timesheets."""
+    return LoggedTime(
+        user_id=time_log.user_id,
+        task_id=time_log.task_id,
+        project_id=project_id,
+        date=time_log.date,
+        hours=time_log.hours or 0
+    )
+
+
+def _rollup_keys(logged: LoggedTime) -> Tuple[Optional[dict], Optional[dict]]:
+    if logged.user_id is None or logged.task_id is None or logged.date is None:
+        return None, None
+    iso_year, iso_week, _ = logged.date.isocalendar()
+    week = {
+        "user_id": logged.user_id,
+        "iso_year": iso_year,
+        "iso_week": iso_week,
+        "task_id": logged.task_id,
+        "project_id": logged.project_id
+    }
+    month = None
+    if logged.project_id is not None:
+        month = {
+            "user_id": logged.user_id,
+            "year": logged.date.year,
+            "month": logged.date.month,
+            "project_id": logged.project_id
+        }
+    return week, month
+
+
+def record_time_log_change(db: Session, before: Optional[LoggedTime], after: Optional[LoggedTime]):
+    """Apply the difference between two states of a time log to the timesheets.
+
+    Pass ``before=None`` for a new log and ``after=None`` for a deleted one.
+    """
+    record_time_log_changes(db, [(before, after)])
+
+
+def record_time_log_changes(db: Session, changes: Iterable[Tuple[Optional[LoggedTime], Optional[LoggedTime]]]):
+    """Apply the combined difference of many ``(before, after)`` time-log changes."""
+    weekly: Dict[tuple, list] = {}
+    monthly: Dict[tuple, list] = {}
+    for before, after in changes:
+        for logged, sign in ((before, -1), (after, 1)):
+            if logged is None or not logged.hours:
+                continue
+            week, month = _rollup_keys(logged)
+            if week is not None:
+                weekly.setdefault(tuple(week.values()), [week, 0])[1] += sign * logged.hours
+            if month is not None:
+                monthly.setdefault(tuple(month.values()), [month, 0])[1] += sign * logged.hours
+
+    db.flush()
+    for model, rollup in ((TimesheetWeek, weekly), (TimesheetMonth, monthly)):
+        for values, delta in rollup.values():
+            if delta:
+                _upsert_hours(db, model, values, delta)
+
+
+def record_task_moves(db: Session, moves: Iterable[Tuple[int, Optional[int], Optional[int]]]):
+    """Move the timesheet hours of tasks that changed project.
+
+    ``moves`` holds ``(task_id, old_project_id, new_project_id)``. Weekly rows
+    are keyed by task, so they are relabelled in place; monthly rows are
+    keyed by project, so the task's hours move from the old rows to the new.
+    """
+    moves = {task_id: (old, new) for task_id, old, new in moves if old != new}
+    if not moves:
+        return
+
+    db.flush()
+    moved_to = defaultdict(list)
+    for task_id, (_, new_project_id) in moves.items():
+        moved_to[new_project_id].append(task_id)
+    for project_id, task_ids in moved_to.items():
+        db.execute(update(TimesheetWeek).where(TimesheetWeek.task_id.in_(task_ids)).values(project_id=project_id))
+
+    monthly: Dict[tuple, list] = {}
+    logs = db.query(TimeLog.user_id, TimeLog.task_id, TimeLog.date, TimeLog.hours).filter(TimeLog.task_id.in_(moves))
+    for row in logs:
+        for project_id, sign in zip(moves[row.task_id], (-1, 1)):
+            _, month = _rollup_keys(LoggedTime(row.user_id, row.task_id, project_id, row.date, row.hours or 0))
+            if month is not None and row.hours:
+                monthly.setdefault(tuple(month.values()), [month, 0])[1] += sign * row.hours
+    for values, delta in monthly.values():
+        if delta:
+            _upsert_hours(db, TimesheetMonth, values, delta)
+
+
+def _upsert_hours(db: Session, model, values: dict, delta: int):
+    table = model.__table__
+    key_columns = [column.name for column in table.primary_key]
+    row_key = [table.c[name] == values[name] for name in key_columns]
+    dialect_insert = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).values(**values, hours=delta)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={"hours": table.c.hours + statement.excluded.hours}
+        ))
+    else:
+        result = db.execute(update(table).where(*row_key).values(hours=table.c.hours + delta))
+        if result.rowcount == 0:
+            db.execute(insert(table).values(**values, hours=delta))
+
+    if delta < 0:
+        # Drop emptied rows so deleted tasks leave nothing behind
+        db.execute(delete(table).where(*row_key, table.c.hours == 0))
+
+
+def weeks_between(start_date: Optional[date] = None, end_date: Optional[date] = None) -> list:
+    """Conditions selecting the ISO weeks that overlap ``[start_date, end_date]``."""
+    week = tuple_(TimesheetWeek.iso_year, TimesheetWeek.iso_week)
+    conditions = []
+    if start_date:
+        conditions.append(week >= tuple_(*start_date.isocalendar()[:2]))
+    if end_date:
+        conditions.append(week <= tuple_(*end_date.isocalendar()[:2]))
+    return conditions
+
+
+def months_between(start_date: Optional[date] = None, end_date: Optional[date] = None) -> list:
+    """Conditions selecting the months that overlap ``[start_date, end_date]``."""
+    month = tuple_(TimesheetMonth.year, TimesheetMonth.month)
+    conditions = []
+    if start_date:
+        conditions.append(month >= tuple_(start_date.year, start_date.month))
+    if end_date:
+        conditions.append(month <= tuple_(end_date.year, end_date.month))
+    return conditions
+
+
+def rebuild_timesheets(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+    """Recompute both rollup tables from ``time_logs``.
+
+    Returns the number of rows written to each table. The caller is
+    responsible for committing.
+    """
+    weekly = defaultdict(int)
+    monthly = defaultdict(int)
+    logs = db.query(
+        TimeLog.user_id,
+        TimeLog.task_id,
+        Task.project_id,
+        TimeLog.date,
+        TimeLog.hours
+    ).join(Task, TimeLog.task_id == Task.id).yield_per(batch_size)
+    for row in logs:
+        week, month = _rollup_keys(LoggedTime(*row[:4], hours=row.hours or 0))
+        if week is not None:
+            weekly[tuple(week.items())] += row.hours or 0
+        if month is not None:
+            monthly[tuple(month.items())] += row.hours or 0
+
+    db.execute(delete(TimesheetWeek))
+    db.execute(delete(TimesheetMonth))
+    for model, rollup in ((TimesheetWeek, weekly), (TimesheetMonth, monthly)):
+        rows: List[dict] = [dict(key, hours=hours) for key, hours in rollup.items()]
+        for start in range(0, len(rows), batch_size):
+            db.execute(insert(model.__table__), rows[start:start + batch_size])
+    db.flush()
+    return {"timesheet_weeks": len(weekly), "timesheet_months": len(monthly)}
+
+
+def main():
+    """Backfill the timesheet rollups from the time log history."""
+    from .database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        counts = rebuild_timesheets(db)
+        db.commit()
+        print(f"Rebuilt timesheets: {counts['timesheet_weeks']} weekly and {counts['timesheet_months']} monthly row(s).")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
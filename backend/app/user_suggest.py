@@ -0,0 +1,92 @@
+"""
+Prefix suggestions for user pickers.
+
+Matches the start of a user's username, full name or email, case
+insensitively. Each field has an index on ``lower(field)`` (with
+``text_pattern_ops`` on Postgres, so ``LIKE 'prefix%'`` can use it), and
+each is read with its own index range scan that stops after ``limit`` rows.
+Results are ranked username matches first, then full name, then email, and
+the answers for recent prefixes are kept in a small per-process cache.
+"""
+
+import os
+import sys
+from typing import List, Optional
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+from .cache import TTLCache
+from .models import User
+from .schemas.user import User as UserSchema
+
+MAX_SUGGESTIONS = 50
+# Cached answers per process; other workers see user changes after the TTL
+USER_SUGGEST_CACHE_TTL_SECONDS = float(os.getenv("USER_SUGGEST_CACHE_TTL_SECONDS", "30"))
+USER_SUGGEST_CACHE_MAX_SIZE = int(os.getenv("USER_SUGGEST_CACHE_MAX_SIZE", "1024"))
+
+suggestion_cache = TTLCache(maxsize=USER_SUGGEST_CACHE_MAX_SIZE, ttl=USER_SUGGEST_CACHE_TTL_SECONDS, name="user_suggest")
+
+# In rank order; each must match an index in models.py
+SUGGEST_FIELDS = (User.username, User.full_name, User.email)
+
+
+def invalidate_suggestions():
+    """Drop cached suggestions, e.g. after a user was added or renamed."""
+    suggestion_cache.clear()
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """The first string after every string starting with ``prefix``, if there is one."""
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        # Surrogates can't be encoded; the next character is past them
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+
+def _starts_with(expression, prefix: str, dialect: str):
+    if dialect == "postgresql":
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return expression.like(f"{escaped}%", escape="\\")
+    # SQLite only uses expression indexes for comparisons, so match the
+    # range of strings sharing the prefix instead of using LIKE
+    upper_bound = _prefix_upper_bound(prefix)
+    if upper_bound is None:
+        return expression >= prefix
+    return (expression >= prefix) & (expression < upper_bound)
+
+
+def suggest_users(db: Session, query: str, limit: int = 10) -> List[UserSchema]:
+    """Active users whose username, full name or email starts with ``query``."""
+    prefix = query.strip().lower()
+    if not prefix:
+        return []
+    key = (prefix, limit)
+    suggestions = suggestion_cache.get(key)
+    if suggestions is not None:
+        return suggestions
+
+    dialect = db.get_bind().dialect.name
+    columns = [User.__table__.c[name] for name in UserSchema.model_fields]
+    branches = []
+    for rank, field in enumerate(SUGGEST_FIELDS):
+        lowered = func.lower(field)
+        branches.append(select(
+            select(*columns, lowered.label("matched"), literal(rank).label("rank"))
+            .where(_starts_with(lowered, prefix, dialect), User.is_active == True)
+            .order_by(lowered)
+            .limit(limit)
+            .subquery()
+        ))
+    matches = db.execute(union_all(*branches)).mappings().all()
+
+    # Each user once, under the best-ranked field they matched, then alphabetically by it
+    suggestions, seen = [], set()
+    for row in sorted(matches, key=lambda row: (row["rank"], row["matched"])):
+        if row["id"] not in seen and len(suggestions) < limit:
+            seen.add(row["id"])
+            suggestions.append(UserSchema.model_validate({name: row[name] for name in UserSchema.model_fields}))
+    suggestion_cache.set(key, suggestions)
+    return suggestions
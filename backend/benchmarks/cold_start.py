@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark.
+
+Starts a fresh interpreter per run and times the three phases a worker goes
+through before it serves traffic: importing ``app.main``, running the
+lifespan startup, and answering a first request. Apply migrations first
+(``python -m app.migrations``); the app itself no longer does so.
+
+Usage (from the backend directory):
+    python -m benchmarks.cold_start --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Runs in the child interpreter; prints the phase timings as JSON
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client_ready = time.perf_counter()
+with TestClient(app.main.app) as client:
+    started = time.perf_counter()
+    client.get("/health").raise_for_status()
+    served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - client_ready) * 1000,
+    "first_request_ms": (served - started) * 1000
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed-on-startup", action="store_true", help="measure with SEED_ON_STARTUP=true")
+    args = parser.parse_args()
+
+    env = dict(os.environ, SEED_ON_STARTUP="true" if args.seed_on_startup else "false")
+    runs = [run_once(env) for _ in range(args.runs)]
+    print(f"{'phase':<16}{'median ms':>11}{'max ms':>10}")
+    for phase in ("import_ms", "startup_ms", "first_request_ms", "process_ms"):
+        values = [timings[phase] for timings in runs]
+        print(f"{phase[:-3]:<16}{statistics.median(values):>11.1f}{max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Hot endpoint latency benchmark.
+
+Drives the task lists, Kanban board, project summary, performance metrics
+and time-log listing of a running server from concurrent clients. Reports
+p50/p95/p99 latency and the mean number of SQL statements per request,
+read from each response's ``Server-Timing`` header. Load realistic volumes
+first with ``python -m app.synthetic_data``; ``--json`` saves the results,
+so a change can be compared against a baseline run.
+
+Usage (from the backend directory, with the API on localhost:8000):
+    python -m benchmarks.endpoints --username synth5 --password password123 --requests 200 --concurrency 8
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import httpx
+
+SERVER_TIMING_QUERIES = re.compile(r'db;desc="(\d+) queries"')
+
+
+def discover(client: httpx.Client) -> dict:
+    """Pick the ids the endpoint paths are built from."""
+    me = client.get("/users/me").raise_for_status().json()
+    projects = client.get("/projects/", params={"limit": 1000}).raise_for_status().json()
+    if not projects:
+        raise SystemExit("No projects found; generate data with `python -m app.synthetic_data` first")
+    owned = [project["id"] for project in projects if project["owner_id"] == me["id"]]
+    if not owned:
+        raise SystemExit(f"{me['username']} owns none of the first {len(projects)} projects; pick another --username")
+    return {"user_id": me["id"], "projects": [project["id"] for project in projects], "owned": owned}
+
+
+def endpoints(ids: dict) -> Dict[str, Callable[[random.Random], str]]:
+    """Endpoint name to a function building a request path."""
+    return {
+        "tasks": lambda rng: "/tasks/?limit=100",
+        "tasks by project": lambda rng: f"/tasks/?project_id={rng.choice(ids['projects'])}&limit=100",
+        "my tasks": lambda rng: "/tasks/my-tasks?limit=100",
+        "board": lambda rng: f"/projects/{rng.choice(ids['projects'])}/board",
+        "summary": lambda rng: f"/projects/{rng.choice(ids['owned'])}/summary",
+        "performance metrics": lambda rng: "/performance-metrics",
+        "time logs": lambda rng: "/timelog/?limit=100",
+        "my time logs": lambda rng: f"/timelog/?user_id={ids['user_id']}&limit=100"
+    }
+
+
+def run(client: httpx.Client, paths: List[str], concurrency: int) -> List[tuple]:
+    """Request every path; returns ``(seconds, statements)`` per request."""
+
+    def request(path: str):
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+        return elapsed, int(match.group(1)) if match else None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        return list(clients.map(request, paths))
+
+
+def summarize(results: List[tuple]) -> dict:
+    """Latency percentiles and mean statements per request."""
+    latencies = [elapsed * 1000 for elapsed, _ in results]
+    queries = [count for _, count in results if count is not None]
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(results),
+        "p50_ms": round(cuts[49], 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+        "queries_per_request": round(statistics.mean(queries), 1) if queries else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="yuvasreega")
+    parser.add_argument("--password", default="yuvasree")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per endpoint")
+    parser.add_argument("--only", nargs="+", help="endpoint names to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=60) as client:
+        token = client.post("/auth/login", data={"username": args.username, "password": args.password}).raise_for_status().json()
+        client.headers["Authorization"] = f"Bearer {token['access_token']}"
+        ids = discover(client)
+
+        rng = random.Random(args.seed)
+        results = {}
+        print(f"{'endpoint':<22}{'requests':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}")
+        for name, build_path in endpoints(ids).items():
+            if args.only and name not in args.only:
+                continue
+            run(client, [build_path(rng) for _ in range(args.warmup)], args.concurrency)
+            result = summarize(run(client, [build_path(rng) for _ in range(args.requests)], args.concurrency))
+            results[name] = result
+            queries = "-" if result["queries_per_request"] is None else result["queries_per_request"]
+            print(
+                f"{name:<22}{result['requests']:>9}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                f"{result['p99_ms']:>10}{queries:>9}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"base_url": args.base_url, "concurrency": args.concurrency, "results": results}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark.
+
+Drives the password verification path used by ``POST /auth/login`` from
+many concurrent request threads and reports verifications per second for
+each hashing pool size.
+
+Usage (from the backend directory):
+    python -m benchmarks.login_throughput --workers 0 1 2 4 --requests 64
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import passwords
+
+
+def run(workers: int, requests: int, threads: int, hashed: str) -> float:
+    """Return verifications per second for the given pool size."""
+    passwords.configure_pool(workers=workers, concurrency=max(workers, 1) * 2)
+    # Warm the pool so process start-up is not measured
+    passwords.verify_and_update_password("password123", hashed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as request_threads:
+        results = list(request_threads.map(
+            lambda _: passwords.verify_and_update_password("password123", hashed)[0],
+            range(requests)
+        ))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, os.cpu_count() or 4])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=40, help="concurrent request threads (uvicorn's default threadpool is 40)")
+    args = parser.parse_args()
+
+    hashed = passwords.pwd_context.hash("password123")
+    print(f"bcrypt rounds: {passwords.BCRYPT_ROUNDS}, requests: {args.requests}, request threads: {args.threads}")
+    print(f"{'workers':>8}  {'logins/s':>10}")
+    for workers in args.workers:
+        throughput = run(workers, args.requests, args.threads, hashed)
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:>8}  {throughput:>10.1f}")
+    passwords.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import uuid
+
+# Configure the app before it is imported: a throwaway SQLite database and
+# inline password hashing
+_database_dir = tempfile.mkdtemp(prefix="project-dashboard-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("EMAIL_WORKER_ENABLED", "false")
+os.environ.setdefault("ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.auth import create_access_token, get_password_hash
+from app.database import SessionLocal
+from app.main import app
+from app.migrations import run_migrations
+from app.models import User, Project
+
+pytest_plugins = ["app.pytest_plugin"]
+
+run_migrations()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Factory for users with unique names; the database is shared by all tests."""
+
+    def make(**fields):
+        name = f"user-{uuid.uuid4().hex[:10]}"
+        user = User(
+            username=name,
+            email=f"{name}@example.com",
+            full_name=name.title(),
+            hashed_password=get_password_hash("password"),
+            **fields
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+
+
+@pytest.fixture
+def make_project(db, user):
+    def make(**fields):
+        project = Project(title=f"Project {uuid.uuid4().hex[:8]}", owner_id=user.id, **fields)
+        db.add(project)
+        db.commit()
+        return project
+
+    return make
+
+
+@pytest.fixture
+def project(make_project):
+    return make_project()
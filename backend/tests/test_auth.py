@@ -0,0 +1,50 @@
+import hashlib
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from app import cache
+from app.auth import create_access_token, principal_cache, token_cache, verify_token
+
+
+def token_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def test_profile_update_drops_the_cached_principal(client, auth_headers, user):
+    assert client.get("/users/me", headers=auth_headers).json()["full_name"] == user.full_name
+    assert principal_cache.get(user.username) is not None
+
+    client.put("/users/me", json={"full_name": "Renamed Person"}, headers=auth_headers)
+
+    assert principal_cache.get(user.username) is None
+    assert client.get("/users/me", headers=auth_headers).json()["full_name"] == "Renamed Person"
+
+
+def test_renamed_user_old_token_is_rejected(client, auth_headers, user):
+    client.get("/users/me", headers=auth_headers)
+
+    response = client.put("/users/me", json={"username": f"{user.username}-renamed"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert client.get("/users/me", headers=auth_headers).status_code == 401
+
+
+def test_token_entry_expires_at_the_token_exp(user, monkeypatch):
+    token = create_access_token({"sub": user.username}, expires_delta=timedelta(seconds=5))
+
+    assert verify_token(token) == user.username
+
+    value, expires_at = token_cache._data[token_key(token)]
+    assert value == user.username
+    assert expires_at - time.monotonic() <= 5
+    later = time.monotonic() + 6
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: later))
+    assert token_cache.get(token_key(token)) is None
+
+
+def test_expired_token_is_rejected_and_not_cached(user):
+    token = create_access_token({"sub": user.username}, expires_delta=timedelta(seconds=-1))
+
+    assert verify_token(token) is None
+    assert token_cache.get(token_key(token)) is None
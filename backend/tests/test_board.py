@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.mark.parametrize("suffix", ["board", "board/todo"])
+def test_board_limit_must_be_positive(client, auth_headers, project, suffix):
+    response = client.get(f"/projects/{project.id}/{suffix}?limit=0", headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "limit must be at least 1"
+
+
+def test_board_column_continues_from_the_board_cursor(client, auth_headers, project):
+    ids = [
+        client.post("/tasks/", json={"title": f"Card {number}", "project_id": project.id}, headers=auth_headers).json()["id"]
+        for number in range(3)
+    ]
+
+    board = client.get(f"/projects/{project.id}/board?limit=2", headers=auth_headers).json()
+    [todo] = [column for column in board["columns"] if column["status"] == "todo"]
+    assert todo["total"] == 3
+    assert [card["id"] for card in todo["tasks"]] == ids[:2]
+
+    column = client.get(
+        f"/projects/{project.id}/board/todo?limit=2&cursor={todo['next_cursor']}", headers=auth_headers
+    ).json()
+    assert [card["id"] for card in column["tasks"]] == ids[2:]
+    assert column["next_cursor"] is None
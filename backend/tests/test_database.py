@@ -0,0 +1,62 @@
+import asyncio
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import (
+    InstrumentedAsyncQueuePool, _pool_usage, async_database_url, async_engine_options, async_pool_wait_stats,
+    engine_options, shared_memory_url
+)
+
+
+def test_private_memory_urls_are_shared():
+    url = shared_memory_url("sqlite:///:memory:")
+    assert "mode=memory" in url and "cache=shared" in url
+    assert shared_memory_url(async_database_url("sqlite:///:memory:")).startswith("sqlite+aiosqlite:///file:")
+    assert shared_memory_url("sqlite:///./app.db") == "sqlite:///./app.db"
+
+
+def test_sync_and_async_engines_share_an_in_memory_database():
+    url = shared_memory_url("sqlite:///:memory:")
+    sync_engine = create_engine(url, **engine_options(url))
+    async_url = shared_memory_url(async_database_url("sqlite:///:memory:"))
+    async_engine = create_async_engine(async_url, **async_engine_options(async_url))
+    with sync_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE shared_check (id INTEGER)"))
+        connection.execute(text("INSERT INTO shared_check VALUES (1)"))
+
+    async def count():
+        async with async_engine.connect() as connection:
+            return (await connection.execute(text("SELECT count(*) FROM shared_check"))).scalar()
+
+    try:
+        assert asyncio.run(count()) == 1
+    finally:
+        asyncio.run(async_engine.dispose())
+        sync_engine.dispose()
+
+
+def test_async_pool_usage_and_wait_are_reported(tmp_path):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedAsyncQueuePool, pool_size=2)
+    checkouts = async_pool_wait_stats.snapshot()["checkouts"]
+
+    async def usage_while_connected():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            return _pool_usage(async_engine.pool)
+
+    try:
+        usage = asyncio.run(usage_while_connected())
+    finally:
+        asyncio.run(async_engine.dispose())
+    assert usage["pool_class"] == "InstrumentedAsyncQueuePool"
+    assert (usage["size"], usage["checked_out"]) == (2, 1)
+    assert usage["wait"]["checkouts"] == checkouts + 1
+
+
+def test_pool_status_and_metrics_cover_both_engines(client):
+    status = client.get("/health/db-pool").json()
+    assert set(status) == {"sync", "async"}
+    assert status["sync"]["wait"]["checkouts"] > 0
+
+    metrics = client.get("/metrics").text
+    assert 'db_pool_connections{engine="sync",state="checked_out"}' in metrics
+    assert 'db_pool_checkouts_total{engine="sync"}' in metrics
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+import app.email_service
+from app.email_service import EmailOutboxWorker
+from app.models import EmailOutbox
+
+
+class FakeSMTP:
+    """Stands in for aiosmtplib.SMTP; rejects messages to ``failing`` recipients."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.connections = 0
+        self.messages = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        self.connections += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def send_message(self, message):
+        if message["To"] in self.failing:
+            raise RuntimeError("550 mailbox unavailable")
+        self.messages.append(message)
+
+
+@pytest.fixture
+def outbox(db):
+    """Empty outbox, so the worker only sees this test's entries."""
+    db.execute(delete(EmailOutbox))
+    db.commit()
+
+    def add(recipient, template="task_update", **fields):
+        context = {"user_name": "Ada", "task_title": f"Task {uuid.uuid4().hex[:6]}", "project_name": "Apollo",
+                   "update_type": "Status", "updated_by": "Grace"}
+        entry = EmailOutbox(recipient=recipient, template=template, context=context, **fields)
+        db.add(entry)
+        db.commit()
+        return entry
+
+    return add
+
+
+def _address():
+    return f"{uuid.uuid4().hex[:10]}@example.com"
+
+
+def test_wake_from_another_thread_sets_the_event():
+    async def scenario():
+        worker = EmailOutboxWorker()
+        worker._loop = asyncio.get_running_loop()
+        thread = threading.Thread(target=worker.wake)
+        thread.start()
+        thread.join()
+        await asyncio.wait_for(worker._wakeup.wait(), 1)
+
+    asyncio.run(scenario())
+
+
+def test_wake_without_a_running_worker_is_a_no_op():
+    EmailOutboxWorker().wake()
+
+
+def _outbox_recipients(db, template):
+    return db.scalars(select(EmailOutbox.recipient).where(EmailOutbox.template == template)).all()
+
+
+def test_bulk_reassignment_notifies_the_new_assignee(client, db, auth_headers, project, user, make_user):
+    assignee = make_user()
+    created = client.post("/tasks/", json={"title": "Bulk reassign", "project_id": project.id}, headers=auth_headers)
+    task_id = created.json()["id"]
+
+    response = client.put("/tasks/bulk", json=[{"id": task_id, "assignee_id": assignee.id}], headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()[0]["status_code"] == 200
+    recipients = _outbox_recipients(db, "task_assignment")
+    assert assignee.email in recipients
+    assert user.email not in recipients
+
+
+def test_reassignment_notifies_the_new_assignee(client, db, auth_headers, project, user, make_user):
+    assignee = make_user()
+    created = client.post("/tasks/", json={"title": "Reassign", "project_id": project.id}, headers=auth_headers)
+    task_id = created.json()["id"]
+
+    response = client.put(f"/tasks/{task_id}", json={"assignee_id": assignee.id}, headers=auth_headers)
+
+    assert response.status_code == 200
+    recipients = _outbox_recipients(db, "task_assignment")
+    assert assignee.email in recipients
+    assert user.email not in recipients
+
+
+def test_claim_batch_leaves_companion_retries_in_backoff(db):
+    recipient = f"{uuid.uuid4().hex[:10]}@example.com"
+    now = datetime.utcnow()
+    later = now + timedelta(minutes=10)
+    due = EmailOutbox(recipient=recipient, template="task_update", context={}, available_at=now - timedelta(seconds=1))
+    coalescing = EmailOutbox(recipient=recipient, template="task_update", context={}, available_at=later)
+    retrying = EmailOutbox(recipient=recipient, template="task_update", context={}, attempts=1, available_at=later)
+    db.add_all([due, coalescing, retrying])
+    db.commit()
+
+    claimed = asyncio.run(EmailOutboxWorker()._claim_batch())
+
+    claimed_ids = {entry.id for entry in claimed}
+    assert {due.id, coalescing.id} <= claimed_ids
+    assert retrying.id not in claimed_ids
+    db.refresh(retrying)
+    assert (retrying.status, retrying.attempts, retrying.available_at) == ("pending", 1, later)
+
+
+def test_batch_is_sent_over_one_connection(db, outbox, monkeypatch):
+    monkeypatch.setattr(app.email_service, "EMAIL_CONCURRENCY", 1)
+    recipients = [_address() for _ in range(3)]
+    entries = [outbox(recipient) for recipient in recipients]
+    smtp = FakeSMTP()
+
+    claimed = asyncio.run(EmailOutboxWorker(client_factory=smtp).drain_once())
+
+    assert claimed == 3
+    assert smtp.connections == 1
+    assert sorted(message["To"] for message in smtp.messages) == sorted(recipients)
+    for entry in entries:
+        db.refresh(entry)
+        assert (entry.status, entry.attempts, entry.last_error) == ("sent", 1, None)
+        assert entry.sent_at is not None
+
+
+def test_failed_send_is_retried_with_backoff(db, outbox):
+    failing, working = _address(), _address()
+    retried, sent = outbox(failing), outbox(working)
+
+    before = datetime.utcnow()
+    asyncio.run(EmailOutboxWorker(client_factory=FakeSMTP(failing=[failing])).drain_once())
+
+    db.refresh(retried)
+    db.refresh(sent)
+    assert sent.status == "sent"
+    assert (retried.status, retried.attempts, retried.last_error) == ("pending", 1, "550 mailbox unavailable")
+    assert retried.available_at >= before + app.email_service.retry_delay(1)
+    # Still backing off, so the next drain leaves it alone
+    smtp = FakeSMTP()
+    assert asyncio.run(EmailOutboxWorker(client_factory=smtp).drain_once()) == 0
+    assert smtp.connections == 0
+
+
+def test_entry_fails_after_max_attempts(db, outbox, monkeypatch):
+    monkeypatch.setattr(app.email_service, "EMAIL_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(app.email_service, "EMAIL_RETRY_BASE_SECONDS", 0)
+    recipient = _address()
+    entry = outbox(recipient)
+    worker = EmailOutboxWorker(client_factory=FakeSMTP(failing=[recipient]))
+
+    for attempt in range(1, 4):
+        assert asyncio.run(worker.drain_once()) == 1
+        db.refresh(entry)
+        assert entry.attempts == attempt
+    assert entry.status == "failed"
+    assert entry.last_error == "550 mailbox unavailable"
+    assert asyncio.run(worker.drain_once()) == 0
+
+
+def test_queued_notifications_for_one_recipient_become_one_digest(db, outbox):
+    digest, single = _address(), _address()
+    for _ in range(3):
+        outbox(digest)
+    outbox(single)
+    smtp = FakeSMTP()
+
+    assert asyncio.run(EmailOutboxWorker(client_factory=smtp).drain_once()) == 4
+
+    messages = {message["To"]: message for message in smtp.messages}
+    assert len(smtp.messages) == 2
+    assert messages[digest]["Subject"] == "3 task updates"
+    assert messages[single]["Subject"].startswith("Task Updated: ")
+
+
+def test_sent_and_future_notifications_stay_out_of_the_digest(db, outbox):
+    recipient = _address()
+    outbox(recipient, status="sent", attempts=1)
+    outbox(recipient)
+    outbox(recipient, attempts=1, available_at=datetime.utcnow() + timedelta(minutes=10))
+    smtp = FakeSMTP()
+
+    assert asyncio.run(EmailOutboxWorker(client_factory=smtp).drain_once()) == 1
+
+    [message] = smtp.messages
+    assert message["Subject"].startswith("Task Updated: ")
+
+
+def test_notifications_are_due_at_once_unless_a_window_is_set(db, monkeypatch):
+    recipient = _address()
+    app.email_service.queue_email(db, recipient, "task_update")
+    monkeypatch.setattr(app.email_service, "EMAIL_COALESCE_WINDOW_SECONDS", 60)
+    app.email_service.queue_email(db, recipient, "task_update")
+    db.commit()
+
+    now, held = db.scalars(
+        select(EmailOutbox.available_at).where(EmailOutbox.recipient == recipient).order_by(EmailOutbox.id)
+    ).all()
+    assert now <= datetime.utcnow() < held
+    assert held - now >= timedelta(seconds=59)
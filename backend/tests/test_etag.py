@@ -0,0 +1,76 @@
+import pytest
+
+
+def get(client, auth_headers, path, etag=None):
+    headers = dict(auth_headers, **({"If-None-Match": etag} if etag else {}))
+    return client.get(path, headers=headers)
+
+
+@pytest.fixture
+def task(client, auth_headers, project):
+    return client.post("/tasks/", json={"title": "Tagged", "project_id": project.id}, headers=auth_headers).json()
+
+
+@pytest.mark.parametrize("path", ["/tasks/{task}", "/projects/{project}", "/projects/{project}/tasks", "/projects/{project}/board"])
+def test_matching_if_none_match_is_not_modified(client, auth_headers, project, task, path):
+    path = path.format(task=task["id"], project=project.id)
+    first = get(client, auth_headers, path)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    cached = get(client, auth_headers, path, etag)
+
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+    # Weak comparison: the strong form and a list containing it match too
+    assert get(client, auth_headers, path, etag.removeprefix("W/")).status_code == 304
+    assert get(client, auth_headers, path, f'"other", {etag}').status_code == 304
+    assert get(client, auth_headers, path, "*").status_code == 304
+    assert get(client, auth_headers, path, '"other"').status_code == 200
+
+
+def test_task_update_changes_the_etags(client, auth_headers, project, task):
+    task_path, list_path = f"/tasks/{task['id']}", f"/projects/{project.id}/tasks"
+    task_etag = get(client, auth_headers, task_path).headers["ETag"]
+    list_etag = get(client, auth_headers, list_path).headers["ETag"]
+
+    client.put(task_path, json={"title": "Retitled"}, headers=auth_headers)
+
+    assert get(client, auth_headers, task_path, task_etag).status_code == 200
+    assert get(client, auth_headers, list_path, list_etag).status_code == 200
+
+
+def test_bulk_update_changes_the_etags(client, auth_headers, project, task):
+    task_path, list_path = f"/tasks/{task['id']}", f"/projects/{project.id}/tasks"
+    task_etag = get(client, auth_headers, task_path).headers["ETag"]
+    list_etag = get(client, auth_headers, list_path).headers["ETag"]
+
+    response = client.put("/tasks/bulk", json=[{"id": task["id"], "status": "in_progress"}], headers=auth_headers)
+    assert response.json()[0]["status_code"] == 200
+
+    assert get(client, auth_headers, task_path, task_etag).status_code == 200
+    assert get(client, auth_headers, list_path, list_etag).status_code == 200
+
+
+def test_adding_and_removing_rows_changes_the_list_etag(client, auth_headers, project, task):
+    list_path = f"/projects/{project.id}/tasks"
+    before = get(client, auth_headers, list_path).headers["ETag"]
+
+    added = client.post("/tasks/", json={"title": "Another", "project_id": project.id}, headers=auth_headers).json()
+    after_add = get(client, auth_headers, list_path, before)
+    assert after_add.status_code == 200
+
+    client.delete(f"/tasks/{added['id']}", headers=auth_headers)
+    after_delete = get(client, auth_headers, list_path, after_add.headers["ETag"])
+    assert after_delete.status_code == 200
+    assert after_delete.headers["ETag"] == before
+
+
+def test_project_update_changes_its_etag(client, auth_headers, project):
+    path = f"/projects/{project.id}"
+    etag = get(client, auth_headers, path).headers["ETag"]
+
+    client.put(path, json={"title": "Renamed"}, headers=auth_headers)
+
+    assert get(client, auth_headers, path, etag).status_code == 200
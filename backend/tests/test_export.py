@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app import export
+
+COLUMNS = ["id", "date", "hours", "description", "user_id", "username", "task_id", "task_title",
+           "project_id", "project_title", "created_at"]
+
+
+@pytest.fixture
+def logs(client, auth_headers, project):
+    task = client.post("/tasks/", json={"title": "Exported, \"quoted\"", "project_id": project.id}, headers=auth_headers).json()
+    created = [
+        client.post(
+            "/timelog/",
+            json={"task_id": task["id"], "hours": hours, "description": f"Day {day}", "date": f"2024-06-{day:02d}T09:00:00"},
+            headers=auth_headers
+        ).json()
+        for day, hours in ((3, 1), (10, 2), (11, 3), (20, 4), (28, 5))
+    ]
+    return task, created
+
+
+def test_csv_export_of_a_date_range(client, auth_headers, logs, monkeypatch):
+    # Several server-side cursor batches, each its own chunk
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    task, created = logs
+
+    response = client.get(
+        f"/timelog/export?task_id={task['id']}&start_date=2024-06-10&end_date=2024-06-20", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="time_logs.csv"'
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert header == COLUMNS
+    assert [(int(row[0]), row[1], int(row[2]), row[3], row[7]) for row in rows] == [
+        (log["id"], log["date"], log["hours"], log["description"], task["title"]) for log in created[1:4]
+    ]
+
+
+def test_ndjson_export_of_a_date_range(client, auth_headers, logs):
+    task, created = logs
+
+    response = client.get(
+        f"/timelog/export?format=ndjson&task_id={task['id']}&start_date=2024-06-01&end_date=2024-06-10", headers=auth_headers
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [list(row) for row in rows] == [COLUMNS, COLUMNS]
+    assert [(row["id"], row["hours"], row["date"]) for row in rows] == [
+        (log["id"], log["hours"], log["date"]) for log in created[:2]
+    ]
+
+
+def test_empty_csv_export_still_has_a_header(client, auth_headers, logs):
+    task, _ = logs
+
+    response = client.get(f"/timelog/export?task_id={task['id']}&start_date=2030-01-01", headers=auth_headers)
+
+    assert list(csv.reader(io.StringIO(response.text))) == [COLUMNS]
+
+
+def test_unknown_export_format_is_rejected(client, auth_headers):
+    assert client.get("/timelog/export?format=xml", headers=auth_headers).status_code == 400
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import MetaData, create_engine, inspect, text
+
+from app.database import Base
+from app.migrations import run_migrations
+from app.models import TimeLog
+
+
+def test_time_log_dates_become_required(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # The schema as it was when time log dates were optional
+    legacy = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(legacy)
+    legacy.tables["time_logs"].c.date.nullable = True
+    legacy.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO time_logs (id, task_id, user_id, hours, date, created_at) VALUES "
+            "(1, 1, 1, 2, NULL, '2024-03-04 05:06:07'), (2, 1, 1, 3, '2024-05-06 00:00:00', '2024-05-07 00:00:00')"
+        ))
+
+    run_migrations(engine)
+    run_migrations(engine)
+
+    inspector = inspect(engine)
+    assert not {column["name"]: column for column in inspector.get_columns("time_logs")}["date"]["nullable"]
+    assert {index["name"] for index in inspector.get_indexes("time_logs")} >= {index.name for index in TimeLog.__table__.indexes}
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT id, hours, date FROM time_logs ORDER BY id")).all()
+    assert [(id, hours, datetime.fromisoformat(date)) for id, hours, date in rows] == [
+        (1, 2, datetime(2024, 3, 4, 5, 6, 7)),
+        (2, 3, datetime(2024, 5, 6))
+    ]
+    engine.dispose()
+
+
+def test_time_log_date_cannot_be_cleared(client, auth_headers, project):
+    task = client.post("/tasks/", json={"title": "Dated", "project_id": project.id}, headers=auth_headers).json()
+    log = client.post(
+        "/timelog/",
+        json={"task_id": task["id"], "hours": 1, "date": "2024-01-02T00:00:00"},
+        headers=auth_headers
+    ).json()
+
+    response = client.put(f"/timelog/{log['id']}", json={"date": None}, headers=auth_headers)
+
+    assert response.status_code == 422
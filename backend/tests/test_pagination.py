@@ -0,0 +1,40 @@
+import pytest
+
+from app.models import Task
+from app.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("path", ["/tasks/?limit=0", "/users/?limit=0", "/projects/?limit=-1", "/timelog/?limit=0"])
+def test_non_positive_limit_is_rejected(client, auth_headers, path):
+    response = client.get(path, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "limit must be at least 1"
+
+
+def test_cursor_pages_through_every_row(client, auth_headers, project):
+    for number in range(5):
+        client.post("/tasks/", json={"title": f"Page {number}", "project_id": project.id}, headers=auth_headers)
+
+    seen, cursor = [], None
+    while True:
+        path = f"/projects/{project.id}/tasks?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200
+        seen += [task["id"] for task in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert len(seen) == 5 and seen == sorted(seen)
+
+
+@pytest.mark.parametrize("values", [["abc"], [True], [1.5], [1, 2], {"id": 1}])
+def test_cursor_values_must_match_their_keys(client, auth_headers, values):
+    response = client.get(f"/tasks/?limit=5&cursor={encode_cursor(values)}", headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([7]), [Task.id]) == [7]
@@ -0,0 +1,89 @@
+import pytest
+from passlib.context import CryptContext
+
+from app import passwords
+
+OUTDATED_ROUNDS = passwords.BCRYPT_ROUNDS + 1
+
+
+def outdated_hash(password):
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=OUTDATED_ROUNDS).hash(password)
+
+
+def rounds(hashed_password):
+    return int(hashed_password.split("$")[2])
+
+
+def test_login_rehashes_an_outdated_hash(client, db, user):
+    user.hashed_password = outdated_hash("password")
+    db.commit()
+
+    response = client.post("/auth/login", data={"username": user.username, "password": "password"})
+
+    assert response.status_code == 200
+    db.refresh(user)
+    assert rounds(user.hashed_password) == passwords.BCRYPT_ROUNDS
+    assert passwords.verify_and_update_password("password", user.hashed_password) == (True, None)
+
+
+def test_login_keeps_a_current_hash(client, db, user):
+    before = user.hashed_password
+
+    response = client.post("/auth/login", data={"username": user.username, "password": "password"})
+
+    assert response.status_code == 200
+    db.refresh(user)
+    assert user.hashed_password == before
+
+
+def test_failed_login_keeps_an_outdated_hash(client, db, user):
+    user.hashed_password = before = outdated_hash("password")
+    db.commit()
+
+    response = client.post("/auth/login", data={"username": user.username, "password": "wrong"})
+
+    assert response.status_code == 401
+    db.refresh(user)
+    assert user.hashed_password == before
+
+
+@pytest.fixture
+def pooled():
+    """Hash in a worker process for the test, then return to inline hashing."""
+    workers = passwords._workers
+    passwords.configure_pool(workers=1)
+    try:
+        yield
+    finally:
+        passwords.configure_pool(workers=workers)
+
+
+def results(password, stored, outdated):
+    current = passwords.hash_password(password)
+    return {
+        "hash": current,
+        "verify_current": passwords.verify_and_update_password(password, stored),
+        "verify_wrong": passwords.verify_and_update_password("wrong", stored),
+        "rehash": passwords.verify_and_update_password(password, outdated)
+    }
+
+
+def test_pool_and_inline_hashing_agree(pooled):
+    stored = passwords.hash_password("secret")
+    outdated = outdated_hash("secret")
+    assert passwords._executor is not None
+    pool = results("secret", stored, outdated)
+    passwords.configure_pool(workers=0)
+    inline = results("secret", stored, outdated)
+    assert passwords._executor is None
+
+    for outcome in (pool, inline):
+        assert rounds(outcome["hash"]) == passwords.BCRYPT_ROUNDS
+        assert outcome["verify_current"] == (True, None)
+        assert outcome["verify_wrong"] == (False, None)
+        verified, new_hash = outcome["rehash"]
+        assert verified and rounds(new_hash) == passwords.BCRYPT_ROUNDS
+    # Each path verifies the other's hashes
+    assert passwords.verify_and_update_password("secret", pool["hash"]) == (True, None)
+    passwords.configure_pool(workers=1)
+    assert passwords.verify_and_update_password("secret", inline["hash"]) == (True, None)
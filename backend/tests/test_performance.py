@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import literal, select
+from app.performance import _whole_days_between, compute_performance_metrics
+
+
+def metrics_query_count(db, query_budget):
+    with query_budget(10) as stats:
+        compute_performance_metrics(db)
+    return stats.count
+
+
+def test_query_count_does_not_grow_with_projects(client, auth_headers, db, make_project, query_budget):
+    # A project without a stats row, so both runs take the same fallback path
+    make_project()
+    before = metrics_query_count(db, query_budget)
+
+    for _ in range(5):
+        project = make_project()
+        make_project()
+        for title in ("First", "Second"):
+            client.post("/tasks/", json={"title": title, "project_id": project.id, "status": "closed"}, headers=auth_headers)
+
+    assert metrics_query_count(db, query_budget) == before
+
+
+def test_performance_metrics_endpoint(client, auth_headers, project):
+    response = client.get("/performance-metrics", headers=auth_headers)
+    assert response.status_code == 200
+    assert project.id in {row["project_id"] for row in response.json()["project_health"]}
+
+
+@pytest.mark.parametrize("elapsed", [
+    timedelta(hours=-36), timedelta(hours=-1), timedelta(seconds=-1),
+    timedelta(0), timedelta(hours=1), timedelta(hours=36)
+])
+def test_whole_days_round_down_like_timedelta(db, elapsed):
+    start = datetime(2024, 3, 4, 12, 0, 0)
+    days = _whole_days_between(literal(start), literal(start + elapsed), db.get_bind().dialect.name)
+    assert db.execute(select(days)).scalar() == elapsed.days
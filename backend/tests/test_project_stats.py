@@ -0,0 +1,80 @@
+from sqlalchemy import select, update
+
+from app import project_stats
+from app.models import ProjectStats
+from app.project_stats import STATS_FIELDS, compute_project_stats, rebuild_project_stats
+
+
+def stored_stats(db, project_id):
+    db.expire_all()
+    row = db.scalars(select(ProjectStats).where(ProjectStats.project_id == project_id)).one()
+    return {field: getattr(row, field) for field in STATS_FIELDS}
+
+
+def assert_in_sync(db, *project_ids):
+    for project_id in project_ids:
+        assert stored_stats(db, project_id) == compute_project_stats(db, [project_id])[project_id]
+
+
+def test_task_writes_keep_stats_in_sync(client, db, auth_headers, project, make_project):
+    other = make_project()
+    created = [
+        client.post(
+            "/tasks/", json={"title": f"Stat {number}", "project_id": project.id, "estimated_hours": number + 1},
+            headers=auth_headers
+        ).json()
+        for number in range(3)
+    ]
+    assert_in_sync(db, project.id)
+    assert stored_stats(db, project.id)["total_estimated_hours"] == 6
+
+    client.put(f"/tasks/{created[0]['id']}", json={"status": "in_progress", "estimated_hours": 10}, headers=auth_headers)
+    assert_in_sync(db, project.id)
+    assert stored_stats(db, project.id)["in_progress_tasks"] == 1
+
+    client.put(f"/tasks/{created[1]['id']}", json={"project_id": other.id}, headers=auth_headers)
+    assert_in_sync(db, project.id, other.id)
+    assert stored_stats(db, other.id)["total_tasks"] == 1
+
+    client.delete(f"/tasks/{created[2]['id']}", headers=auth_headers)
+    assert_in_sync(db, project.id, other.id)
+    assert stored_stats(db, project.id)["total_tasks"] == 1
+    assert rebuild_project_stats(db, [project.id, other.id]) == []
+
+
+def test_missing_row_is_created_from_the_tasks(client, db, auth_headers, project):
+    client.post("/tasks/", json={"title": "Before", "project_id": project.id}, headers=auth_headers)
+    db.query(ProjectStats).filter(ProjectStats.project_id == project.id).delete()
+    db.commit()
+
+    client.post("/tasks/", json={"title": "After", "project_id": project.id}, headers=auth_headers)
+
+    assert stored_stats(db, project.id)["total_tasks"] == 2
+    assert_in_sync(db, project.id)
+
+
+def test_concurrently_created_row_takes_the_delta(client, db, auth_headers, project):
+    client.post("/tasks/", json={"title": "Existing", "project_id": project.id}, headers=auth_headers)
+
+    # As if another transaction inserted the row after this one's update missed it
+    project_stats._insert_stats(db, project.id, {"total_tasks": 1, "todo_tasks": 1})
+    db.commit()
+
+    stats = stored_stats(db, project.id)
+    assert (stats["total_tasks"], stats["todo_tasks"]) == (2, 2)
+    # The simulated task never existed; leave no drift behind for other tests
+    rebuild_project_stats(db, [project.id])
+    db.commit()
+
+
+def test_cli_reports_drift(client, db, auth_headers, project, capsys):
+    client.post("/tasks/", json={"title": "Drifting", "project_id": project.id}, headers=auth_headers)
+    db.execute(update(ProjectStats).where(ProjectStats.project_id == project.id).values(total_tasks=6))
+    db.commit()
+
+    project_stats.main()
+
+    output = capsys.readouterr().out
+    assert f"Project {project.id}: total_tasks was 6, now 1" in output
+    assert "Rebuilt project stats, 1 drifted value(s) corrected." in output
+    assert_in_sync(db, project.id)
@@ -0,0 +1,49 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models import User
+from app.query_stats import QUERY_REPEAT_THRESHOLD, QueryStatsMiddleware, RepeatedQueryError, SERVER_TIMING_HEADER
+
+
+def n_plus_one_app(lookups: int) -> FastAPI:
+    """An app whose only route runs the same statement ``lookups`` times."""
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/users")
+    def users(db: Session = Depends(get_db)):
+        return [db.execute(select(User.id).where(User.id == user_id)).scalar() for user_id in range(lookups)]
+
+    return app
+
+
+def test_server_timing_counts_statements(client, auth_headers, project):
+    response = client.get(f"/projects/{project.id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert 'db;desc="' in response.headers[SERVER_TIMING_HEADER]
+
+
+def test_query_budget_passes_under_budget(client, auth_headers, project, query_budget):
+    with query_budget(5) as stats:
+        assert client.get(f"/projects/{project.id}", headers=auth_headers).status_code == 200
+    assert 0 < stats.count <= 5
+
+
+def test_query_budget_fails_over_budget(client, auth_headers, project, query_budget):
+    with pytest.raises(pytest.fail.Exception, match="budget is 0"):
+        with query_budget(0):
+            client.get(f"/projects/{project.id}", headers=auth_headers)
+
+
+def test_repeated_statement_fails_request():
+    client = TestClient(n_plus_one_app(QUERY_REPEAT_THRESHOLD))
+    with pytest.raises(RepeatedQueryError):
+        client.get("/users")
+
+
+def test_statements_below_threshold_pass():
+    client = TestClient(n_plus_one_app(QUERY_REPEAT_THRESHOLD - 1))
+    assert client.get("/users").status_code == 200
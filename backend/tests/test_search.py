@@ -0,0 +1,28 @@
+import uuid
+
+import app.search
+
+
+def test_snippets_are_escaped_and_highlighted(client, auth_headers, project):
+    word = f"zebra{uuid.uuid4().hex[:8]}"
+    client.post(
+        "/tasks/",
+        json={"title": "Escaping", "description": f"<img src=x onerror=alert(1)> & {word}", "project_id": project.id},
+        headers=auth_headers
+    )
+
+    response = client.get(f"/search/?q={word}&project_id={project.id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    [result] = response.json()
+    assert "&lt;img src=x onerror=alert(1)&gt; &amp;" in result["snippet"]
+    assert f"<mark>{word}</mark>" in result["snippet"]
+    assert "<img" not in result["snippet"]
+
+
+def test_unsupported_database_is_not_implemented(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(app.search, "SEARCH_DIALECTS", ())
+
+    response = client.get("/search/?q=anything", headers=auth_headers)
+
+    assert response.status_code == 501
@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+PRINT_TABLES = (
+    "import json; from sqlalchemy import inspect; from app.database import engine; "
+    "print(json.dumps(sorted(inspect(engine).get_table_names())))"
+)
+
+
+def run_python(database, code, **env):
+    """Run ``code`` in a fresh interpreter against its own SQLite database; returns its last output line."""
+    environment = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "PASSWORD_HASH_WORKERS": "0",
+        "BCRYPT_ROUNDS": "4",
+        "EMAIL_WORKER_ENABLED": "false",
+        "ACTUAL_HOURS_RECONCILE_INTERVAL_SECONDS": "0",
+        "SEED_ON_STARTUP": "false",
+        **env
+    }
+    environment.pop("ASYNC_DATABASE_URL", None)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND, env=environment, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_app_creates_no_tables(tmp_path):
+    assert run_python(tmp_path / "app.db", f"import app.main; {PRINT_TABLES}") == []
+
+
+def test_migrations_can_run_twice(tmp_path):
+    code = f"from app.migrations import run_migrations; run_migrations(); run_migrations(); {PRINT_TABLES}"
+    tables = run_python(tmp_path / "app.db", code)
+
+    assert {"users", "projects", "tasks", "time_logs", "project_stats", "timesheet_weeks", "search_index"} <= set(tables)
+    # A later run in a new process finds everything in place
+    assert run_python(tmp_path / "app.db", code) == tables
+
+
+def test_seed_on_startup_seeds_once(tmp_path):
+    code = (
+        "import json\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.migrations import run_migrations\n"
+        "from app.database import SessionLocal\n"
+        "from app.main import app\n"
+        "from app.models import User, Project\n"
+        "run_migrations()\n"
+        "counts = []\n"
+        "for _ in range(2):\n"
+        "    with TestClient(app):\n"
+        "        pass\n"
+        "    with SessionLocal() as db:\n"
+        "        counts.append([db.query(User).count(), db.query(Project).count()])\n"
+        "print(json.dumps(counts))\n"
+    )
+    first, second = run_python(tmp_path / "app.db", code, SEED_ON_STARTUP="true")
+
+    assert first[0] > 0 and first[1] > 0
+    assert second == first
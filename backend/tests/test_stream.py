@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+from app.events import broker
+from app.routers.stream import _format_event
+
+
+def test_task_change_reaches_only_its_project_subscribers(client, auth_headers, project, make_project):
+    other = make_project()
+    task = client.post("/tasks/", json={"title": "Streamed", "project_id": project.id}, headers=auth_headers).json()
+
+    async def scenario():
+        await broker.start()
+        try:
+            async with broker.subscribe(project.id) as mine, broker.subscribe(other.id) as theirs:
+                # Request handlers publish from the threadpool, as in the app
+                response = await asyncio.to_thread(
+                    client.put, f"/tasks/{task['id']}", json={"status": "in_progress"}, headers=auth_headers
+                )
+                assert response.status_code == 200
+                change = await asyncio.wait_for(mine.get(), 1)
+                await asyncio.sleep(0.05)
+                return change, theirs.qsize()
+        finally:
+            await broker.stop()
+
+    change, other_queued = asyncio.run(scenario())
+
+    assert (change["entity"], change["id"], change["op"], change["project_id"]) == ("task", task["id"], "updated", project.id)
+    assert change["data"]["status"] == "in_progress"
+    assert other_queued == 0
+    assert broker.subscriber_count() == 0
+
+    frame = _format_event(change)
+    assert frame.startswith(f"id: {change['seq']}\nevent: task.updated\ndata: ")
+    assert json.loads(frame.split("data: ", 1)[1])["id"] == task["id"]
+
+
+def test_stream_requires_a_token_and_an_existing_project(client, auth_headers):
+    assert client.get("/stream/projects/1").status_code == 401
+    assert client.get("/stream/projects/999999", headers=auth_headers).status_code == 404
+    assert client.get("/stream/projects/999999?access_token=nonsense").status_code == 401
@@ -0,0 +1,64 @@
+import pytest
+
+
+def _token(client, auth_headers):
+    return client.get("/sync/", headers=auth_headers).json()["token"]
+
+
+def _task_with_children(client, auth_headers, project, title="Synced"):
+    task = client.post("/tasks/", json={"title": title, "project_id": project.id}, headers=auth_headers).json()
+    comment = client.post(f"/tasks/{task['id']}/comments", json={"content": "First"}, headers=auth_headers).json()
+    time_log = client.post(
+        "/timelog/", json={"task_id": task["id"], "hours": 2, "date": "2024-02-03T00:00:00"}, headers=auth_headers
+    ).json()
+    return task, comment, time_log
+
+
+def test_changes_since_token(client, auth_headers, project):
+    token = _token(client, auth_headers)
+    task, comment, time_log = _task_with_children(client, auth_headers, project)
+
+    response = client.get(f"/sync/?since={token}", headers=auth_headers).json()
+
+    assert [row["id"] for row in response["changes"]["tasks"]] == [task["id"]]
+    assert [row["id"] for row in response["changes"]["comments"]] == [comment["id"]]
+    assert [row["id"] for row in response["changes"]["time_logs"]] == [time_log["id"]]
+    assert response["has_more"] is False and response["reset"] is False
+
+    again = client.get(f"/sync/?since={response['token']}", headers=auth_headers).json()
+    assert again["token"] == response["token"]
+    assert again["changes"]["tasks"] == [] and again["deleted"]["tasks"] == []
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_deleting_a_task_tombstones_its_detached_rows(client, auth_headers, project, bulk):
+    task, comment, time_log = _task_with_children(client, auth_headers, project)
+    token = _token(client, auth_headers)
+
+    if bulk:
+        response = client.request("DELETE", "/tasks/bulk", json={"ids": [task["id"]]}, headers=auth_headers)
+    else:
+        response = client.delete(f"/tasks/{task['id']}", headers=auth_headers)
+    assert response.status_code == 200
+
+    changes = client.get(f"/sync/?since={token}", headers=auth_headers).json()
+    assert changes["deleted"] == {"projects": [], "tasks": [task["id"]], "comments": [comment["id"]], "time_logs": [time_log["id"]]}
+
+
+def test_pages_until_has_more_is_false(client, auth_headers, project):
+    token = _token(client, auth_headers)
+    ids = [
+        client.post("/tasks/", json={"title": f"Paged {number}", "project_id": project.id}, headers=auth_headers).json()["id"]
+        for number in range(3)
+    ]
+
+    seen, pages = [], 0
+    while True:
+        response = client.get(f"/sync/?since={token}&limit=2", headers=auth_headers).json()
+        pages += 1
+        seen += [row["id"] for row in response["changes"]["tasks"]]
+        token = response["token"]
+        if not response["has_more"]:
+            break
+    assert pages == 2
+    assert seen == ids
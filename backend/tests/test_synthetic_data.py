@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.migrations import run_migrations
+from app.models import Comment, Project, Task, TimeLog, TimesheetMonth, TimesheetWeek, User
+from app.project_stats import rebuild_project_stats
+from app.synthetic_data import generate
+from app.timesheets import rebuild_timesheets
+
+TABLES = {"users": User, "projects": Project, "tasks": Task, "time_logs": TimeLog, "comments": Comment}
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def engine(request, tmp_path):
+    """A fresh SQLite file, or the scratch Postgres database (exercising COPY) when configured."""
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path / 'synthetic.db'}"
+    else:
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+
+def counts(db):
+    return {table: db.scalar(select(func.count()).select_from(model)) for table, model in TABLES.items()}
+
+
+def rollups(db):
+    return {
+        model.__tablename__: sorted(tuple(row) for row in db.execute(select(*model.__table__.columns)))
+        for model in (TimesheetWeek, TimesheetMonth)
+    }
+
+
+def test_generate_writes_consistent_data(engine):
+    with Session(engine) as db:
+        before = counts(db)
+
+    # A batch size that splits every table across several batches
+    written = generate(engine, users=5, projects=3, tasks=20, time_logs=60, comments=10, batch_size=7)
+
+    assert {table: written[table] for table in TABLES} == {
+        "users": 5, "projects": 3, "tasks": 20, "time_logs": 60, "comments": 10
+    }
+    assert written["project_stats"] == 3
+    with Session(engine) as db:
+        after = counts(db)
+        assert {table: after[table] - before[table] for table in TABLES} == {table: written[table] for table in TABLES}
+
+        logged = dict(db.execute(select(TimeLog.task_id, func.sum(TimeLog.hours)).group_by(TimeLog.task_id)).all())
+        for task_id, actual_hours in db.execute(select(Task.id, Task.actual_hours)):
+            assert actual_hours == logged.get(task_id, 0)
+
+        generated = rollups(db)
+        rebuild_timesheets(db)
+        assert rollups(db) == generated
+        assert rebuild_project_stats(db) == []
+        db.rollback()
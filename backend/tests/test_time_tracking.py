@@ -0,0 +1,96 @@
+import os
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models import Task, TimeLog
+from app.query_stats import capture_queries
+from app.time_tracking import logged_between, reconcile_actual_hours
+
+
+def query_plan(db, statement) -> str:
+    """SQLite's EXPLAIN QUERY PLAN for a statement, one step per line."""
+    if db.get_bind().dialect.name != "sqlite":
+        pytest.skip("asserts SQLite query plans")
+    compiled = statement.compile(dialect=db.get_bind().dialect)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters)
+    # A covering index only differs in not visiting the table
+    return "\n".join(row[-1].replace("COVERING INDEX", "INDEX") for row in rows)
+
+
+@pytest.fixture(scope="module")
+def postgres_db():
+    """Session on the Postgres database named by TEST_POSTGRES_URL, with the schema created."""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # The tables are nearly empty; make the planner show whether an index can serve the query
+        session.execute(text("SET enable_seqscan = off"))
+        yield session
+        session.rollback()
+    engine.dispose()
+
+
+def postgres_plan(db, statement) -> str:
+    """Postgres's EXPLAIN for a statement, one plan node per line."""
+    compiled = statement.compile(dialect=db.get_bind().dialect)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+    return "\n".join(row[0] for row in rows)
+
+
+DATE_RANGE_INDEXES = [
+    (TimeLog.user_id, "ix_time_logs_user_id_date"),
+    (TimeLog.task_id, "ix_time_logs_task_id_date")
+]
+
+
+@pytest.mark.parametrize("column, index", DATE_RANGE_INDEXES)
+def test_date_range_uses_composite_index(db, column, index):
+    statement = select(TimeLog.id, func.sum(TimeLog.hours)).where(
+        column == 1, *logged_between(date(2024, 1, 1), date(2024, 1, 31))
+    )
+    plan = query_plan(db, statement)
+    assert f"USING INDEX {index} ({column.key}=? AND date>? AND date<?)" in plan
+
+
+def test_open_ended_range_uses_composite_index(db):
+    plan = query_plan(db, select(TimeLog.id).where(TimeLog.user_id == 1, *logged_between(start_date=date(2024, 1, 1))))
+    assert "USING INDEX ix_time_logs_user_id_date (user_id=? AND date>?)" in plan
+
+
+@pytest.mark.parametrize("column, index", DATE_RANGE_INDEXES)
+def test_date_range_uses_composite_index_on_postgres(postgres_db, column, index):
+    statement = select(TimeLog.id, TimeLog.hours).where(
+        column == 1, *logged_between(date(2024, 1, 1), date(2024, 1, 31))
+    )
+    plan = postgres_plan(postgres_db, statement)
+    # Index Scan, Index Only Scan and Bitmap Index Scan all name the index
+    assert f"Index Scan using {index} on time_logs" in plan or f"Bitmap Index Scan on {index}" in plan or \
+        f"Index Only Scan using {index} on time_logs" in plan, plan
+    assert "Seq Scan on time_logs" not in plan
+
+
+def test_reconcile_repairs_drift_in_one_statement(client, auth_headers, project, db, query_budget):
+    task = client.post("/tasks/", json={"title": "Drifting", "project_id": project.id}, headers=auth_headers).json()
+    manual = client.post("/tasks/", json={"title": "Manual", "project_id": project.id}, headers=auth_headers).json()
+    for hours in (2, 3):
+        client.post("/timelog/", json={"task_id": task["id"], "hours": hours, "date": "2024-03-04T09:00:00"}, headers=auth_headers)
+    db.execute(update(Task).where(Task.id == task["id"]).values(actual_hours=1))
+    db.execute(update(Task).where(Task.id == manual["id"]).values(actual_hours=7))
+    db.commit()
+
+    with capture_queries() as stats:
+        corrections = reconcile_actual_hours(db)
+    db.commit()
+
+    assert {"task_id": task["id"], "project_id": project.id, "actual": 5} in corrections
+    assert sum("UPDATE tasks" in statement for statement in stats.statements) == 1
+    assert db.get(Task, task["id"]).actual_hours == 5
+    # Tasks without logs keep their hand-entered hours
+    assert db.get(Task, manual["id"]).actual_hours == 7
+    assert reconcile_actual_hours(db) == []
@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.fixture
+def logged_task(client, auth_headers, project):
+    """A task with time logs spread over several weeks and months."""
+    task = client.post("/tasks/", json={"title": "Logged task", "project_id": project.id}, headers=auth_headers).json()
+    for day in range(1, 25):
+        client.post("/timelog/", json={
+            "task_id": task["id"], "hours": 1, "date": f"2024-{day % 3 + 1:02d}-{day:02d}T09:00:00"
+        }, headers=auth_headers)
+    # Warm the authentication caches, so budgets count only the endpoint's own statements
+    client.get("/users/me", headers=auth_headers)
+    return task
+
+
+@pytest.mark.parametrize("params", ["", "?limit=5", "?start_date=2024-01-01&end_date=2024-02-15"])
+def test_time_log_listing_runs_one_statement(client, auth_headers, logged_task, query_budget, params):
+    with query_budget(1):
+        response = client.get(f"/timelog/{params}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() and all(row["task_title"] and row["project_title"] for row in response.json())
+
+
+def test_time_log_listing_by_task_and_user(client, auth_headers, logged_task, user, query_budget):
+    path = f"/timelog/?task_id={logged_task['id']}&user_id={user.id}"
+    with query_budget(1):
+        response = client.get(path, headers=auth_headers)
+    assert len(response.json()) == 24
+
+
+@pytest.mark.parametrize("params", ["", "?start_date=2024-01-01&end_date=2024-02-15"])
+def test_user_time_summary_runs_two_statements(client, auth_headers, logged_task, user, query_budget, params):
+    path = f"/timelog/summary/user/{user.id}{params}"
+    with query_budget(2):
+        response = client.get(path, headers=auth_headers)
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["total_hours"] == 24
+    assert [row["task_title"] for row in summary["task_summary"]] == ["Logged task"]
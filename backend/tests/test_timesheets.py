@@ -0,0 +1,54 @@
+from app.models import TimesheetWeek
+
+
+def project_hours(client, auth_headers, project_id, period):
+    response = client.get(f"/timelog/summary/project/{project_id}/{period}", headers=auth_headers)
+    assert response.status_code == 200
+    rows = response.json()["weeks" if period == "weekly" else "months"]
+    return sum(row["total_hours"] for row in rows)
+
+
+def create_logged_task(client, auth_headers, project, hours):
+    task = client.post("/tasks/", json={"title": "Moving task", "project_id": project.id}, headers=auth_headers).json()
+    logs = [
+        client.post("/timelog/", json={
+            "task_id": task["id"], "hours": logged, "date": f"2024-03-0{day}T10:00:00"
+        }, headers=auth_headers).json()
+        for day, logged in enumerate(hours, start=4)
+    ]
+    return task, logs
+
+
+def test_moving_a_task_moves_its_timesheet_hours(client, auth_headers, make_project, db):
+    old_project, new_project = make_project(), make_project()
+    task, logs = create_logged_task(client, auth_headers, old_project, [3, 2])
+
+    response = client.put(f"/tasks/{task['id']}", json={"project_id": new_project.id}, headers=auth_headers)
+    assert response.status_code == 200
+
+    for period in ("weekly", "monthly"):
+        assert project_hours(client, auth_headers, old_project.id, period) == 0
+        assert project_hours(client, auth_headers, new_project.id, period) == 5
+    assert {week.project_id for week in db.query(TimesheetWeek).filter(TimesheetWeek.task_id == task["id"])} == {new_project.id}
+
+    # Later changes to the moved task's logs land on the new project
+    assert client.delete(f"/timelog/{logs[1]['id']}", headers=auth_headers).status_code == 200
+    for period in ("weekly", "monthly"):
+        assert project_hours(client, auth_headers, old_project.id, period) == 0
+        assert project_hours(client, auth_headers, new_project.id, period) == 3
+
+
+def test_bulk_moving_tasks_moves_their_timesheet_hours(client, auth_headers, make_project):
+    old_project, new_project = make_project(), make_project()
+    first, _ = create_logged_task(client, auth_headers, old_project, [4])
+    second, _ = create_logged_task(client, auth_headers, old_project, [1, 6])
+
+    response = client.put("/tasks/bulk", json=[
+        {"id": first["id"], "project_id": new_project.id},
+        {"id": second["id"], "project_id": new_project.id}
+    ], headers=auth_headers)
+    assert [result["status_code"] for result in response.json()] == [200, 200]
+
+    for period in ("weekly", "monthly"):
+        assert project_hours(client, auth_headers, old_project.id, period) == 0
+        assert project_hours(client, auth_headers, new_project.id, period) == 11
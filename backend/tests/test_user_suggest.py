@@ -0,0 +1,80 @@
+import sys
+import uuid
+
+import pytest
+
+from app.auth import get_password_hash
+from app.models import User
+from app.user_suggest import _prefix_upper_bound
+
+
+@pytest.fixture
+def add_user(db):
+    def add(username, email, full_name=None, is_active=True):
+        user = User(username=username, email=email, full_name=full_name, is_active=is_active,
+                    hashed_password=get_password_hash("password"))
+        db.add(user)
+        db.commit()
+        return user
+
+    return add
+
+
+@pytest.fixture
+def tag():
+    """Unique prefix, since the database and suggestion cache are shared."""
+    return f"sg{uuid.uuid4().hex[:8]}"
+
+
+def suggest(client, auth_headers, q):
+    response = client.get("/users/suggest", params={"q": q}, headers=auth_headers)
+    assert response.status_code == 200
+    return [user["id"] for user in response.json()]
+
+
+def test_prefix_matches_each_field_case_insensitively(client, auth_headers, add_user, tag):
+    by_email = add_user(f"e-{tag}", f"{tag.upper()}@example.com")
+    by_name = add_user(f"n-{tag}", f"n-{tag}@example.com", full_name=f"{tag.title()} Name")
+    by_username = add_user(f"{tag.upper()}-user", f"u-{tag}@example.com")
+    inactive = add_user(f"{tag}-gone", f"g-{tag}@example.com", is_active=False)
+
+    matches = suggest(client, auth_headers, tag.title())
+
+    # Ranked username matches first, then full name, then email
+    assert matches == [by_username.id, by_name.id, by_email.id]
+    assert inactive.id not in matches
+    assert suggest(client, auth_headers, f"{tag}zz") == []
+
+
+@pytest.mark.parametrize("last", ["z", "ÿ", "\ud7ff", chr(sys.maxunicode)])
+def test_prefix_ending_at_a_code_point_boundary(client, auth_headers, add_user, tag, last):
+    match = add_user(f"{tag}{last}", f"b-{tag}@example.com")
+    add_user(f"{tag}{last}"[:-1] + "\U0010fffe", f"c-{tag}@example.com")
+
+    assert suggest(client, auth_headers, f"{tag}{last}") == [match.id]
+
+
+def test_prefix_upper_bound():
+    assert _prefix_upper_bound("ab") == "ac"
+    assert _prefix_upper_bound("a\ud7ff") == "a\ue000"
+    assert _prefix_upper_bound(f"a{chr(sys.maxunicode)}") == "b"
+    assert _prefix_upper_bound(chr(sys.maxunicode)) is None
+
+
+def test_register_invalidates_cached_suggestions(client, auth_headers, tag):
+    assert suggest(client, auth_headers, tag) == []
+
+    registered = client.post(
+        "/auth/register", json={"username": f"{tag}-new", "email": f"{tag}@example.com", "password": "password"}
+    ).json()
+
+    assert suggest(client, auth_headers, tag) == [registered["id"]]
+
+
+def test_profile_update_invalidates_cached_suggestions(client, auth_headers, user, tag):
+    assert suggest(client, auth_headers, tag) == []
+
+    response = client.put("/users/me", json={"full_name": f"{tag} Renamed"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert suggest(client, auth_headers, tag) == [user.id]
@@ -16,6 +16,8 @@ const TaskForm = () => {
   const { tasks, loading: tasksLoading, error } = useSelector((state) => state.tasks);
   const { user: currentUser } = useSelector((state) => state.auth);
   const [users, setUsers] = useState([]);
+  const [assigneeQuery, setAssigneeQuery] = useState('');
+  const [selectedAssignee, setSelectedAssignee] = useState(null);
   
   const loading = projectsLoading || tasksLoading;
 
@@ -37,18 +39,24 @@ const TaskForm = () => {
       dispatch(fetchTasks());
     }
     dispatch(fetchProjects());
-    
-    // Fetch all users for assignee dropdown
+  }, [dispatch, isEditing]);
+
+  // Assignee options come from the suggest endpoint as the user types
+  useEffect(() => {
     const fetchUsers = async () => {
       try {
-        const response = await usersAPI.getAll();
+        const query = assigneeQuery.trim();
+        const response = query
+          ? await usersAPI.suggest(query)
+          : await usersAPI.getAll({ limit: 20 });
         setUsers(response.data);
       } catch (error) {
         console.error('Error fetching users:', error);
       }
     };
-    fetchUsers();
-  }, [dispatch, isEditing]);
+    const timer = setTimeout(fetchUsers, 200);
+    return () => clearTimeout(timer);
+  }, [assigneeQuery]);
 
   useEffect(() => {
     if (isEditing && tasks.length > 0) {
@@ -64,12 +72,25 @@ const TaskForm = () => {
           project_id: task.project_id || '',
           assignee_id: task.assignee_id || '',
         });
+        setSelectedAssignee(task.assignee_id
+          ? { id: task.assignee_id, full_name: task.assignee_name, username: task.assignee_username }
+          : null);
       }
     }
   }, [isEditing, tasks, id]);
 
+  // Keep the chosen assignee selectable when it is not among the current matches
+  const assigneeOptions = [...users];
+  const assignee = selectedAssignee || (currentUser && String(currentUser.id) === String(formData.assignee_id) ? currentUser : null);
+  if (assignee && String(assignee.id) === String(formData.assignee_id) && !users.some(user => user.id === assignee.id)) {
+    assigneeOptions.unshift(assignee);
+  }
+
   const handleChange = (e) => {
     const { name, value } = e.target;
+    if (name === 'assignee_id') {
+      setSelectedAssignee(assigneeOptions.find(user => String(user.id) === value) || null);
+    }
     setFormData(prev => ({
       ...prev,
       [name]: value
@@ -304,6 +325,13 @@ const TaskForm = () => {
                     <label htmlFor="assignee_id" className="block text-sm font-semibold text-gray-700 mb-2">
                       Assignee
                     </label>
+                    <input
+                      type="search"
+                      value={assigneeQuery}
+                      onChange={(e) => setAssigneeQuery(e.target.value)}
+                      className="block w-full mb-2 px-3 py-2 border border-gray-300 rounded-xl shadow-sm text-sm placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-primary-500 transition-colors duration-200"
+                      placeholder="Search by name, username or email"
+                    />
                     <div className="relative">
                       <div className="absolute inset-y-0 left-0 pl-3 flex items-center pointer-events-none">
                         <svg className="h-5 w-5 text-gray-400" fill="none" stroke="currentColor" viewBox="0 0 24 24">
@@ -318,7 +346,7 @@ const TaskForm = () => {
                         className="block w-full pl-10 pr-3 py-3 border border-gray-300 rounded-xl shadow-sm focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-primary-500 transition-colors duration-200"
                       >
                         <option value="">Unassigned</option>
-                        {users.map(user => (
+                        {assigneeOptions.map(user => (
                           <option key={user.id} value={user.id}>
                             {user.full_name || user.username}
                             {user.id === currentUser?.id && ' (You)'}
@@ -57,6 +57,8 @@ export const projectsAPI = {
   create: (projectData) => api.post('/projects', projectData),
   update: (id, projectData) => api.put(`/projects/${id}`, projectData),
   delete: (id) => api.delete(`/projects/${id}`),
+  getBoard: (id, params) => api.get(`/projects/${id}/board`, { params }),
+  getBoardColumn: (id, status, params) => api.get(`/projects/${id}/board/${status}`, { params }),
 };
 
 // Task API
@@ -87,6 +89,7 @@ export const usersAPI = {
   getCurrentUser: () => api.get('/users/me'),
   updateCurrentUser: (userData) => api.put('/users/me', userData),
   getAll: (params) => api.get('/users', { params }),
+  suggest: (q, limit = 10) => api.get('/users/suggest', { params: { q, limit } }),
 };
 
 // Time Log API
@@ -99,6 +102,11 @@ export const timelogAPI = {
   getTimeSummary: (userId, filters = {}) => api.get(`/timelog/summary/user/${userId}`, { params: filters }),
 };
 
+// Search API
+export const searchAPI = {
+  search: (q, params = {}) => api.get('/search', { params: { q, ...params } }),
+};
+
 
 
 export default api; 
\ No newline at end of file